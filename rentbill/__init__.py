@@ -0,0 +1,36 @@
+# Core invoicing API. Importing the package pulls in neither Streamlit nor
+# reportlab; see rentbill.core.import_report().
+from rentbill.core import (
+    PEOPLE,
+    RECIPIENT,
+    THEMES,
+    InvoiceLine,
+    Person,
+    import_report,
+    invoice_amounts,
+    invoice_seq_and_fy,
+    invoice_totals,
+    make_invoice_pdf,
+)
+from rentbill.registry import load_from_env as _load_registry_from_env
+from rentbill.words import amount_to_words, amounts_to_words, number_to_words_indian
+
+# RENTBILL_REGISTRY=<.json|.sqlite> replaces the built-in landlords, recipient
+# and themes (see rentbill.registry)
+_load_registry_from_env()
+
+__all__ = [
+    "PEOPLE",
+    "RECIPIENT",
+    "THEMES",
+    "InvoiceLine",
+    "Person",
+    "amount_to_words",
+    "amounts_to_words",
+    "import_report",
+    "invoice_amounts",
+    "invoice_seq_and_fy",
+    "invoice_totals",
+    "make_invoice_pdf",
+    "number_to_words_indian",
+]
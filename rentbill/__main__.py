@@ -0,0 +1,48 @@
+import argparse
+import importlib
+import json
+import sys
+
+# command -> (module, help). Only the chosen command's module is imported, so
+# e.g. "batch" never pays for pandas and "--help" loads nothing heavy.
+COMMANDS = {
+    "batch": ("rentbill.batch", "Render invoices for all landlords x FY months"),
+    "schedule": ("rentbill.schedule", "Write the rent/GST schedule for landlords x FY months as CSV"),
+    "gst": ("rentbill.gst_register", "Write the GST register (invoices, landlord x month / FY, FY totals) as CSV, Excel or Parquet"),
+    "bill": ("rentbill.billing", "Split date ranges into pro-rata monthly line items (CSV in, CSV out)"),
+    "registry": ("rentbill.registry", "Validate, export or search a landlord registry file (JSON or SQLite)"),
+    "words": ("rentbill.words", "Spell amounts in words, or verify the fast speller against the reference"),
+    "sync": ("rentbill.sheets_sync", "Append an FY's ledger entries to a Google Sheet"),
+    "serve": ("rentbill.server", "Serve invoice PDFs over HTTP on localhost (or load-test the service)"),
+    "bench": ("rentbill.bench", "Benchmark PDF rendering, wrapping, words and batch runs"),
+    "check": ("rentbill.checks", "Check invoice layouts (short invoices fit on one page)"),
+}
+
+
+def _import_time(args) -> int:
+    from rentbill.core import import_report
+
+    print(json.dumps(import_report(), indent=2))
+    return 0
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(prog="python -m rentbill", description="Rent invoice tools (no Streamlit required)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    subparsers = {name: sub.add_parser(name, help=help_) for name, (_, help_) in COMMANDS.items()}
+    sub.add_parser("import-time", help="Report how long the core took to import").set_defaults(func=_import_time)
+
+    command = next((a for a in argv if not a.startswith("-")), None)
+    if command in COMMANDS:
+        module = importlib.import_module(COMMANDS[command][0])
+        module.add_arguments(subparsers[command])
+        subparsers[command].set_defaults(func=module.run)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
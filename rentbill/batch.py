@@ -0,0 +1,436 @@
+import csv
+import datetime
+import io
+import os
+import sys
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from rentbill import registry
+from rentbill.core import (
+    PEOPLE,
+    RECIPIENT,
+    Person,
+    configure_pdf,
+    draw_invoice_page,
+    fy_starts,
+    invoice_amounts,
+    invoice_file_name,
+    make_invoice_pdf,
+    new_canvas,
+    save_canvas,
+    theme_for,
+)
+from rentbill.ledger import InvoiceLedger, make_entry
+from rentbill.periods import period_index
+
+# -----------------------------------
+# JOBS
+# -----------------------------------
+@dataclass
+class InvoiceJob:
+    person_key: str
+    invoice_no: str
+    invoice_date: datetime.date
+    from_date: datetime.date
+    to_date: datetime.date
+    rent: float
+    # Set for jobs planned from the lease book (tenant and location come from the lease)
+    lease_id: str | None = None
+    series: str = ""
+    # Another lease of this landlord uses the same series; file names then carry the lease id
+    shared_series: bool = False
+
+    @property
+    def fy_label(self) -> str:
+        return period_index.for_date(self.invoice_date).fy
+
+    @property
+    def file_name(self) -> str:
+        series = self.series
+        if self.shared_series and self.lease_id is not None:
+            series = "_".join(x for x in (series, self.lease_id) if x)
+        return invoice_file_name(PEOPLE[self.person_key], self.invoice_date, series)
+
+    @property
+    def arcname(self) -> str:
+        return f"{self.fy_label}/{self.person_key}/{self.file_name}"
+
+
+def load_rent_overrides(path: str) -> dict:
+    """
+    CSV with columns name,period,rent. `period` is YYYY-MM and may be left
+    blank to override a landlord's rent for every month.
+    """
+    overrides = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            name = (row.get("name") or "").strip()
+            if name not in PEOPLE:
+                raise ValueError(f"Unknown landlord in rent overrides: {name!r}")
+            period = (row.get("period") or "").strip() or None
+            overrides[(name, period)] = float(row["rent"])
+    return overrides
+
+
+def rent_for(person_key: str, invoice_date: datetime.date, rent_overrides: dict | None = None) -> float:
+    if rent_overrides:
+        period = invoice_date.strftime("%Y-%m")
+        for k in ((person_key, period), (person_key, None)):
+            if k in rent_overrides:
+                return float(rent_overrides[k])
+    return float(PEOPLE[person_key].default_rent)
+
+
+def plan_jobs(
+    person_keys=None,
+    fy_range=None,
+    rent_overrides: dict | None = None,
+) -> list[InvoiceJob]:
+    """One job per landlord per FY month, in FY order then PEOPLE order."""
+    person_keys = list(person_keys or PEOPLE.keys())
+    fy_range = list(fy_range or fy_starts)
+
+    jobs = []
+    for fy_start in fy_range:
+        for p in period_index.fy(fy_start):
+            for key in person_keys:
+                jobs.append(InvoiceJob(
+                    person_key=key,
+                    invoice_no=p.invoice_no,
+                    invoice_date=p.invoice_date,
+                    from_date=p.from_date,
+                    to_date=p.to_date,
+                    rent=rent_for(key, p.invoice_date, rent_overrides),
+                ))
+    return jobs
+
+
+def plan_lease_jobs(person_keys=None, fy_range=None) -> list[InvoiceJob]:
+    """
+    One job per lease active in each FY month, in FY order then PEOPLE
+    order then lease start. A lease that starts or ends mid-month is billed
+    for its days only, pro-rata as in rentbill.billing.
+    """
+    from rentbill.billing import line_items
+
+    order = {key: i for i, key in enumerate(person_keys or PEOPLE.keys())}
+    index = registry.current().lease_index
+    series_count = {}
+    for lease in index.leases.values():
+        series_count[lease.landlord, lease.series] = series_count.get((lease.landlord, lease.series), 0) + 1
+
+    jobs = []
+    for fy_start in (fy_range or fy_starts):
+        for p in period_index.fy(fy_start):
+            leases = sorted((x for x in index.for_period(p) if x.landlord in order), key=lambda x: order[x.landlord])
+            for lease in leases:
+                from_date = max(lease.start, p.from_date)
+                to_date = min(lease.end or p.to_date, p.to_date)
+                jobs.append(InvoiceJob(
+                    person_key=lease.landlord,
+                    invoice_no=lease.invoice_no(p),
+                    invoice_date=p.invoice_date,
+                    from_date=from_date,
+                    to_date=to_date,
+                    rent=line_items(lease.landlord, from_date, to_date, rent=lease.rent)[0].rent,
+                    lease_id=lease.id,
+                    series=lease.series,
+                    shared_series=series_count[lease.landlord, lease.series] > 1,
+                ))
+    return jobs
+
+
+# -----------------------------------
+# RENDER / OUTPUT
+# -----------------------------------
+def job_parties(job: InvoiceJob) -> tuple[Person, dict]:
+    """(landlord as printed, recipient) for a job: from its lease, else the landlord and the default recipient."""
+    if job.lease_id is not None:
+        reg = registry.current()
+        return reg.lease_parties(reg.lease_index.leases[job.lease_id])
+    return PEOPLE[job.person_key], RECIPIENT
+
+
+def job_invoice(job: InvoiceJob) -> dict:
+    """make_invoice_pdf keyword arguments for a job."""
+    sgst, cgst, total, amount_words = invoice_amounts(job.rent)
+    person, recipient = job_parties(job)
+    return dict(
+        person=person,
+        invoice_no=job.invoice_no,
+        invoice_date=job.invoice_date,
+        from_date=job.from_date,
+        to_date=job.to_date,
+        rent=job.rent,
+        sgst=sgst,
+        cgst=cgst,
+        total=total,
+        amount_words=amount_words,
+        theme=theme_for(job.person_key),
+        recipient=recipient,
+    )
+
+
+def render_job(job: InvoiceJob) -> bytes:
+    registry.refresh()  # long-lived pool workers (server) follow registry edits too
+    return make_invoice_pdf(**job_invoice(job))
+
+
+@dataclass
+class RenderResult:
+    job: InvoiceJob
+    pdf: bytes | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _render_safe(job: InvoiceJob) -> RenderResult:
+    # Runs in pool workers: never raise, so one bad job can't sink the batch
+    try:
+        return RenderResult(job=job, pdf=render_job(job))
+    except Exception as e:
+        return RenderResult(job=job, error=f"{type(e).__name__}: {e}")
+
+
+def default_chunk_size(n_jobs: int, workers: int) -> int:
+    return max(1, n_jobs // (workers * 4))
+
+
+def _render_chunk(jobs: list[InvoiceJob]) -> list[RenderResult]:
+    return [_render_safe(job) for job in jobs]
+
+
+def iter_render(jobs: list[InvoiceJob], workers: int = 1, chunk_size: int | None = None, mp_context=None):
+    """
+    Yield a RenderResult per job, in job order, rendering on `workers`
+    processes. Only a couple of chunks per worker are in flight at a time,
+    so a slow consumer (e.g. a ZIP going to a socket) keeps memory bounded.
+    `mp_context` picks how workers start (e.g. "spawn" from a threaded server).
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            yield _render_safe(job)
+        return
+
+    chunk_size = chunk_size or default_chunk_size(len(jobs), workers)
+    max_in_flight = workers * 2
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as pool:
+        pending = deque()
+
+        def drain_one():
+            chunk, fut = pending.popleft()
+            try:
+                return fut.result()
+            except Exception as e:  # worker died (e.g. BrokenProcessPool)
+                return [RenderResult(job=job, error=f"{type(e).__name__}: {e}") for job in chunk]
+
+        for i in range(0, len(jobs), chunk_size):
+            chunk = jobs[i:i + chunk_size]
+            pending.append((chunk, pool.submit(_render_chunk, chunk)))
+            if len(pending) >= max_in_flight:
+                yield from drain_one()
+        while pending:
+            yield from drain_one()
+
+
+def render_jobs(jobs: list[InvoiceJob], workers: int = 1, chunk_size: int | None = None) -> list[RenderResult]:
+    return list(iter_render(jobs, workers=workers, chunk_size=chunk_size))
+
+
+def write_zip(results, dest) -> list[RenderResult]:
+    """
+    Stream results into a ZIP at `dest` (a path or a writable binary file,
+    which may be unseekable such as a socket or stdout). Each entry is
+    written as soon as its PDF arrives.
+    """
+    failed = []
+    with zipfile.ZipFile(dest, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for r in results:
+            if not r.ok:
+                failed.append(r)
+                continue
+            with zf.open(r.job.arcname, "w") as entry:
+                entry.write(r.pdf)
+    return failed
+
+
+def write_combined_pdf(jobs: list[InvoiceJob], dest) -> list[RenderResult]:
+    """
+    Every job's pages (an invoice may run to several) in a single PDF at
+    `dest` (a path or a writable binary file). Each landlord's static layer
+    is a shared form, so a page only adds its own stamped fields. reportlab
+    keeps the whole document in memory until save, so memory grows with the
+    pack: split big runs with write_pdf_packs, or write a ZIP, which streams.
+    Each invoice is drawn on a scratch canvas first; jobs that fail there are
+    left out and returned, the rest still make up the pack.
+    """
+    failed, invoices = [], []
+    for job in jobs:
+        try:
+            invoice = job_invoice(job)
+            draw_invoice_page(new_canvas(io.BytesIO()), **invoice)
+        except Exception as e:
+            failed.append(RenderResult(job=job, error=f"{type(e).__name__}: {e}"))
+            continue
+        invoices.append((job, invoice))
+
+    c = new_canvas(dest)
+    c.setTitle(f"Tax Invoices ({len(invoices)})")
+    for job, invoice in invoices:
+        draw_invoice_page(c, **invoice)
+    save_canvas(c)
+    return failed
+
+
+PACK_SIZE = 500
+
+
+def pack_paths(out: str, n_jobs: int, pack_size: int = PACK_SIZE) -> list[str]:
+    """`out` itself, or <stem>_001.pdf, <stem>_002.pdf ... when the jobs need more than one pack."""
+    n_packs = max(1, -(-n_jobs // pack_size))
+    if n_packs == 1:
+        return [out]
+    stem = out[:-len(".pdf")]
+    return [f"{stem}_{n:03d}.pdf" for n in range(1, n_packs + 1)]
+
+
+def write_pdf_packs(jobs: list[InvoiceJob], out: str, pack_size: int = PACK_SIZE) -> list[RenderResult]:
+    """write_combined_pdf over `pack_size` jobs at a time, each pack saved before the next is drawn."""
+    failed = []
+    for i, path in enumerate(pack_paths(out, len(jobs), pack_size)):
+        failed += write_combined_pdf(jobs[i * pack_size:(i + 1) * pack_size], path)
+    return failed
+
+
+def write_tree(results, out_dir: str) -> list[RenderResult]:
+    failed = []
+    for r in results:
+        if not r.ok:
+            failed.append(r)
+            continue
+        path = os.path.join(out_dir, *r.job.arcname.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(r.pdf)
+    return failed
+
+
+def job_ledger_entry(job: InvoiceJob, pdf: bytes | None = None):
+    person, recipient = job_parties(job)
+    return make_entry(
+        landlord=job.person_key,
+        invoice_no=job.invoice_no,
+        invoice_date=job.invoice_date,
+        from_date=job.from_date,
+        to_date=job.to_date,
+        rent=job.rent,
+        pdf=pdf,
+        recipient_gstin=recipient["gstin"],
+        place_of_supply=f"{person.state_code}-{person.state_name}",
+        lease_id=job.lease_id,
+    )
+
+
+def record_results(results, ledger: InvoiceLedger, batch_size: int = 500):
+    """Pass results through, recording successful ones in the ledger in batches."""
+    pending = []
+    for r in results:
+        if r.ok:
+            pending.append(job_ledger_entry(r.job, r.pdf))
+            if len(pending) >= batch_size:
+                ledger.record_many(pending)
+                pending = []
+        yield r
+    if pending:
+        ledger.record_many(pending)
+
+
+# -----------------------------------
+# CLI
+# -----------------------------------
+def add_arguments(parser):
+    parser.add_argument("out", help="Output .zip, combined .pdf, directory, or - for a ZIP on stdout")
+    parser.add_argument("--fy-from", type=int, default=fy_starts[0], help="First FY start year (default: %(default)s)")
+    parser.add_argument("--fy-to", type=int, default=None, help="Last FY start year, inclusive (default: same as --fy-from)")
+    parser.add_argument("--name", action="append", choices=list(PEOPLE.keys()), help="Landlord to include (repeatable; default: all)")
+    parser.add_argument("--rent-overrides", help="CSV of name,period,rent overrides")
+    parser.add_argument("--leases", action="store_true",
+                        help="One invoice per active lease (landlord x property x tenant) from the registry, "
+                             "instead of one per landlord")
+    parser.add_argument("--workers", type=int, default=1, help="Render processes; 0 = one per CPU (default: %(default)s)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Jobs handed to a worker at a time (default: auto)")
+    parser.add_argument("--pack-size", type=int, default=PACK_SIZE,
+                        help="Combined .pdf: invoices per file; more are split into <out>_001.pdf, ... "
+                             "(memory grows with a pack; use a .zip for very large runs) (default: %(default)s)")
+    parser.add_argument("--ledger", help="SQLite invoice ledger to record issued invoices in "
+                                         "(a combined .pdf has no per-invoice file, so its rows carry no PDF hash)")
+    parser.add_argument("--compress-level", type=int, choices=range(-1, 10), default=None,
+                        help="zlib level for PDF streams (default: RENTBILL_PDF_COMPRESS_LEVEL or 9)")
+    parser.add_argument("--timestamped", action="store_true",
+                        help="Stamp the real creation time (PDFs then differ byte-for-byte on every run)")
+
+
+def run(args) -> int:
+    fy_to = args.fy_to if args.fy_to is not None else args.fy_from
+    if fy_to < args.fy_from:
+        raise SystemExit("--fy-to must not be earlier than --fy-from")
+
+    if args.compress_level is not None:
+        configure_pdf(compress_level=args.compress_level)
+    if args.timestamped:
+        configure_pdf(deterministic=False)
+
+    if args.leases:
+        if args.rent_overrides:
+            raise SystemExit("--rent-overrides does not apply to --leases (rent comes from each lease)")
+        jobs = plan_lease_jobs(person_keys=args.name, fy_range=range(args.fy_from, fy_to + 1))
+    else:
+        rent_overrides = load_rent_overrides(args.rent_overrides) if args.rent_overrides else None
+        jobs = plan_jobs(
+            person_keys=args.name,
+            fy_range=range(args.fy_from, fy_to + 1),
+            rent_overrides=rent_overrides,
+        )
+
+    if args.out.lower().endswith(".pdf") and args.workers != 1:
+        raise SystemExit("--workers does not apply to a combined .pdf (all pages are drawn on one canvas)")
+    if args.pack_size < 1:
+        raise SystemExit("--pack-size must be at least 1")
+
+    workers = args.workers or os.cpu_count() or 1
+    results = iter_render(jobs, workers=workers, chunk_size=args.chunk_size)
+    ledger = InvoiceLedger(args.ledger) if args.ledger else None
+    if ledger is not None:
+        results = record_results(results, ledger)
+
+    out = args.out
+    if out == "-":
+        failed = write_zip(results, sys.stdout.buffer)
+    elif out.lower().endswith(".zip"):
+        failed = write_zip(results, out)
+    elif out.lower().endswith(".pdf"):
+        failed = write_pdf_packs(jobs, out, args.pack_size)
+        paths = pack_paths(out, len(jobs), args.pack_size)
+        out = paths[0] if len(paths) == 1 else f"{paths[0]} .. {paths[-1]} ({len(paths)} files)"
+        if ledger is not None:
+            # pdf_sha256 stays NULL: the invoices only exist as pages of the pack
+            failed_jobs = {id(r.job) for r in failed}
+            ledger.record_many(job_ledger_entry(j) for j in jobs if id(j) not in failed_jobs)
+    else:
+        failed = write_tree(results, out)
+
+    if ledger is not None:
+        ledger.close()
+
+    # Keep stdout clean when it carries the ZIP
+    log = sys.stderr if out == "-" else sys.stdout
+    print(f"Wrote {len(jobs) - len(failed)} invoices to {out}", file=log)
+    for r in failed:
+        print(f"FAILED {r.job.arcname}: {r.error}", file=log)
+    return 1 if failed else 0
@@ -0,0 +1,251 @@
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+from rentbill import batch
+from rentbill.core import (
+    PEOPLE,
+    RECIPIENT,
+    THEMES,
+    InvoiceLine,
+    invoice_amounts,
+    invoice_totals,
+    make_invoice_pdf,
+    normalize_text_for_display,
+)
+from rentbill.layout import wrap_lines, wrap_text
+from rentbill.leases import Lease, LeaseIndex
+from rentbill.words import amounts_to_words, number_to_words_indian, reference_words
+
+# -----------------------------------
+# BENCHMARK HARNESS
+# -----------------------------------
+def peak_rss_kb() -> int:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def _percentile(sorted_vals, q):
+    if not sorted_vals:
+        return 0.0
+    k = (len(sorted_vals) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(sorted_vals) - 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (k - lo)
+
+
+def measure(name: str, fn, inner: int = 1, min_time: float = 0.5, min_samples: int = 5) -> dict:
+    """
+    Call fn() `inner` times per sample until `min_time` seconds and
+    `min_samples` samples have passed. Latencies are per call.
+    """
+    fn()  # warm caches / imports
+    samples = []
+    start = time.perf_counter()
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(inner):
+            fn()
+        samples.append((time.perf_counter() - t0) / inner)
+        if len(samples) >= min_samples and time.perf_counter() - start >= min_time:
+            break
+    elapsed = sum(samples) * inner
+    samples.sort()
+    return {
+        "name": name,
+        "calls": len(samples) * inner,
+        "ops_per_sec": (len(samples) * inner) / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(samples, 0.50) * 1000,
+        "p95_ms": _percentile(samples, 0.95) * 1000,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+# -----------------------------------
+# CASES
+# -----------------------------------
+LONG_DESC = " ".join([next(iter(PEOPLE.values())).desc] * 4)
+LONG_ADDRESS = ", ".join(
+    line for p in PEOPLE.values() for line in p.address_lines
+) + ", " + ", ".join(RECIPIENT["address_lines"])
+
+# Spans units .. crores (incl. values that recurse into "Crore Crore")
+WORDS_VALUES = [0, 7, 19, 99, 100, 101, 999, 1000, 10001, 99999, 100000, 263928, 1999999,
+                10000000, 123456789, 999999999, 1234567890123]
+
+
+def _invoice_kwargs(person_key: str, theme_key: str) -> dict:
+    person = PEOPLE[person_key]
+    d = datetime.date(2026, 4, 1)
+    sgst, cgst, total, words = invoice_amounts(person.default_rent)
+    return dict(
+        person=person, invoice_no="01 / 2026-27", invoice_date=d, from_date=d, to_date=datetime.date(2026, 4, 30),
+        rent=person.default_rent, sgst=sgst, cgst=cgst, total=total, amount_words=words, theme=THEMES[theme_key],
+    )
+
+
+def _arrears_kwargs(rows: int, person_key: str | None = None) -> dict:
+    """A `rows`-line arrears invoice (one rent row per month, then interest)."""
+    kwargs = _invoice_kwargs(person_key or next(iter(PEOPLE)), next(iter(THEMES)))
+    items = tuple(
+        InvoiceLine(f"ARREARS OF RENT FOR {datetime.date(2018 + m // 12, m % 12 + 1, 1):%B %Y}", 223667.53)
+        for m in range(rows - 1)
+    ) + (InvoiceLine("Interest on arrears @ 1.5% per month", 45678.9),)
+    rent, sgst, cgst, total, words = invoice_totals(items)
+    kwargs.update(rent=rent, sgst=sgst, cgst=cgst, total=total, amount_words=words, items=items)
+    return kwargs
+
+
+def _synthetic_leases(n: int) -> list[Lease]:
+    """`n` leases of 1-3 years starting across 2000-2026; one in 20 is open-ended."""
+    base = datetime.date(2000, 1, 1)
+    leases = []
+    for i in range(n):
+        start = base + datetime.timedelta(days=(i * 7919) % (27 * 365))
+        end = None if i % 20 == 0 else start + datetime.timedelta(days=365 + (i * 104729) % 730)
+        leases.append(Lease(f"L{i}", "landlord", f"P{i % 5000}", "tenant", 100000.0, start, end))
+    return leases
+
+
+def run_suite(min_time: float = 0.5, batch_n: int = 120, workers: int = 1) -> list[dict]:
+    results = []
+
+    for person_key in PEOPLE:
+        for theme_key in THEMES:
+            kwargs = _invoice_kwargs(person_key, theme_key)
+            results.append(measure(f"make_invoice_pdf[{person_key}|{theme_key}]",
+                                   lambda kw=kwargs: make_invoice_pdf(**kw), min_time=min_time))
+
+    for rows in (2, 3, 12, 100):
+        kwargs = _arrears_kwargs(rows)
+        results.append(measure(f"make_invoice_pdf[{rows} rows]", lambda kw=kwargs: make_invoice_pdf(**kw),
+                               min_time=min_time))
+
+    results.append(measure("wrap[long_address]", lambda: wrap_text(LONG_ADDRESS, "Helvetica", 10, 220),
+                           inner=20, min_time=min_time))
+    results.append(measure("wrap[long_desc]", lambda: wrap_text(LONG_DESC, "Helvetica", 10, 220),
+                           inner=20, min_time=min_time))
+    results.append(measure("wrap[amount_words]",
+                           lambda: wrap_text(f"Amount in words: {number_to_words_indian(1234567890)} Only", "Helvetica", 10, 500),
+                           inner=20, min_time=min_time))
+
+    # Same strings with the memo bypassed: cost of the width tables + incremental measure alone
+    uncached = wrap_lines.__wrapped__
+    results.append(measure("wrap[long_address, uncached]", lambda: uncached(LONG_ADDRESS, "Helvetica", 10, 220),
+                           inner=20, min_time=min_time))
+    results.append(measure("wrap[long_desc, uncached]", lambda: uncached(LONG_DESC, "Helvetica", 10, 220),
+                           inner=20, min_time=min_time))
+
+    def words_sweep(spell):
+        for n in WORDS_VALUES:
+            spell(n)
+    results.append(measure(f"number_to_words_indian[x{len(WORDS_VALUES)}]", lambda: words_sweep(number_to_words_indian),
+                           inner=50, min_time=min_time))
+    results.append(measure(f"number_to_words_indian[reference, x{len(WORDS_VALUES)}]",
+                           lambda: words_sweep(reference_words), inner=50, min_time=min_time))
+    # Schedule-sized column of totals with paise (mostly distinct)
+    totals = [round(59000 + 0.37 * i, 2) for i in range(12 * 1000)]
+    results.append(measure(f"amounts_to_words[x{len(totals)}]", lambda: amounts_to_words(totals), min_time=min_time))
+
+    norm_lines = [line for p in PEOPLE.values() for line in p.address_lines] + list(RECIPIENT["address_lines"])
+
+    def normalize_all():
+        for line in norm_lines:
+            normalize_text_for_display(line)
+            normalize_text_for_display(line, for_html=True)
+    results.append(measure(f"normalize_text_for_display[x{2 * len(norm_lines)}]", normalize_all, inner=50,
+                           min_time=min_time))
+
+    index = LeaseIndex(_synthetic_leases(50_000))
+    results.append(measure(f"lease_index.active[{len(index)} leases, one month]",
+                           lambda: index.active(datetime.date(2026, 5, 1), datetime.date(2026, 5, 31)),
+                           inner=5, min_time=min_time))
+
+    jobs = batch.plan_jobs(fy_range=range(2026, 2100))[:batch_n]
+
+    def run_batch():
+        for r in batch.iter_render(jobs, workers=workers):
+            if not r.ok:
+                raise RuntimeError(r.error)
+    r = measure(f"batch[{len(jobs)} invoices, workers={workers}]", run_batch, min_time=min_time, min_samples=3)
+    r["invoices_per_sec"] = r["ops_per_sec"] * len(jobs)
+    results.append(r)
+
+    return results
+
+
+def fresh_import_report() -> dict:
+    """import_report() from a fresh interpreter, i.e. what a batch worker pays at startup."""
+    t0 = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", "import json, rentbill; print(json.dumps(rentbill.import_report()))"],
+        capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ).stdout
+    report = json.loads(out)
+    report["process_startup_ms"] = (time.perf_counter() - t0) * 1000
+    return report
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(current: list[dict], baseline: list[dict]) -> list[str]:
+    base = {r["name"]: r for r in baseline}
+    lines = []
+    for r in current:
+        b = base.get(r["name"])
+        if b and b["ops_per_sec"]:
+            ratio = r["ops_per_sec"] / b["ops_per_sec"]
+            lines.append(f"{r['name']:<60} {ratio:6.2f}x ops/sec  p95 {b['p95_ms']:.3f} -> {r['p95_ms']:.3f} ms")
+    return lines
+
+
+# -----------------------------------
+# CLI
+# -----------------------------------
+def add_arguments(parser):
+    parser.add_argument("--out", help="Write results JSON here")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Seconds per case (default: %(default)s)")
+    parser.add_argument("--batch-n", type=int, default=120, help="Invoices in the end-to-end batch case (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=1, help="Workers for the batch case (default: %(default)s)")
+
+
+def run(args) -> int:
+    results = run_suite(min_time=args.min_time, batch_n=args.batch_n, workers=args.workers)
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "import": fresh_import_report(),
+        "results": results,
+    }
+
+    for r in results:
+        print(f"{r['name']:<60} {r['ops_per_sec']:>12.1f} ops/s  p50 {r['p50_ms']:8.3f} ms  "
+              f"p95 {r['p95_ms']:8.3f} ms  rss {r['peak_rss_kb'] / 1024:.1f} MiB")
+    imp = report["import"]
+    print(f"{'import rentbill (fresh process)':<60} core {imp['core_import_ms']:.1f} ms  "
+          f"process {imp['process_startup_ms']:.1f} ms  reportlab loaded: {imp['reportlab_loaded']}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print()
+        print("\n".join(compare(results, baseline["results"])))
+    return 0
@@ -0,0 +1,167 @@
+import datetime
+from dataclasses import dataclass
+
+from rentbill.batch import load_rent_overrides, rent_for
+from rentbill.core import PEOPLE, InvoiceLine, invoice_totals, rent_line
+from rentbill.periods import period_index
+
+# -----------------------------------
+# PRO-RATA LINE ITEMS
+# -----------------------------------
+# A month's rent is charged in full when the range covers the whole calendar
+# month, otherwise round(rent * days / month_days, 2). The single-range path
+# below is plain Python for the UI; bill_ranges() does the same arithmetic for
+# many ranges at once with numpy/pandas and gives identical amounts.
+@dataclass(frozen=True)
+class LineItem:
+    from_date: datetime.date
+    to_date: datetime.date
+    days: int
+    month_days: int
+    base_rent: float
+    rent: float
+
+    @property
+    def full_month(self) -> bool:
+        return self.days == self.month_days
+
+
+def is_single_full_month(from_date: datetime.date, to_date: datetime.date) -> bool:
+    p = period_index.for_date(from_date)
+    return from_date == p.from_date and to_date == p.to_date
+
+
+def line_items(
+    landlord: str,
+    from_date: datetime.date,
+    to_date: datetime.date,
+    rent: float | None = None,
+    rent_overrides: dict | None = None,
+) -> list[LineItem]:
+    """
+    Split from_date..to_date (inclusive) into calendar months. `rent` is the
+    monthly rent; when None it comes from the overrides / PEOPLE like batch.
+    """
+    if to_date < from_date:
+        raise ValueError("to_date is earlier than from_date")
+    items = []
+    d = from_date
+    while d <= to_date:
+        p = period_index.for_date(d)
+        seg_to = min(to_date, p.to_date)
+        base = float(rent) if rent is not None else rent_for(landlord, p.from_date, rent_overrides)
+        days = (seg_to - d).days + 1
+        month_days = p.to_date.day
+        items.append(LineItem(
+            from_date=d,
+            to_date=seg_to,
+            days=days,
+            month_days=month_days,
+            base_rent=base,
+            rent=base if days == month_days else round(base * days / month_days, 2),
+        ))
+        d = seg_to + datetime.timedelta(days=1)
+    return items
+
+
+def invoice_lines(items) -> tuple[InvoiceLine, ...]:
+    """Table rows for the PDF / preview, one per month."""
+    return tuple(rent_line(i.from_date, i.to_date, i.rent) for i in items)
+
+
+def bill_amounts(items):
+    """(rent, sgst, cgst, total, amount_words) for one invoice carrying `items`."""
+    return invoice_totals(invoice_lines(items))
+
+
+# -----------------------------------
+# VECTORIZED (MANY LANDLORDS / RANGES)
+# -----------------------------------
+def split_ranges(ranges):
+    """
+    `ranges` has landlord, from_date, to_date and optionally rent (monthly;
+    blank = default). Returns one row per calendar month touched by each
+    range, clipped to it, with `range_id` = position of the source row.
+    """
+    import numpy as np
+    import pandas as pd
+
+    r = ranges.reset_index(drop=True)
+    f = pd.to_datetime(r["from_date"]).to_numpy().astype("datetime64[D]")
+    t = pd.to_datetime(r["to_date"]).to_numpy().astype("datetime64[D]")
+    if (t < f).any():
+        raise ValueError("to_date is earlier than from_date")
+
+    first_month = f.astype("datetime64[M]")
+    n = (t.astype("datetime64[M]") - first_month).astype(np.int64) + 1
+    range_id = np.repeat(np.arange(len(r)), n)
+    offset = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+    month = first_month[range_id] + offset
+
+    out = pd.DataFrame({
+        "range_id": range_id,
+        "landlord": r["landlord"].to_numpy()[range_id],
+        "from_date": np.maximum(month.astype("datetime64[D]"), f[range_id]),
+        "to_date": np.minimum((month + 1).astype("datetime64[D]") - 1, t[range_id]),
+    })
+    if "rent" in r:
+        out["base_rent"] = pd.to_numeric(r["rent"]).to_numpy(dtype=float)[range_id]
+    return out
+
+
+def bill_ranges(ranges, rent_overrides: dict | None = None):
+    """Line items (one per range x month) with pro-rata rent and per-line GST, in one pass."""
+    from rentbill.schedule import build_schedule
+
+    segments = split_ranges(ranges)
+    lines = build_schedule(periods=segments, rent_overrides=rent_overrides)
+    lines.insert(0, "range_id", segments["range_id"].to_numpy())
+    lines["fraction"] = lines["days"] / lines["month_days"]
+    return lines
+
+
+def consolidate(lines):
+    """One row per range: the consolidated invoice's period, month count and totals."""
+    import numpy as np
+
+    from rentbill.schedule import add_amounts
+
+    lines = lines.assign(paise=np.rint(lines["rent"].to_numpy() * 100).astype(np.int64))
+    out = lines.groupby("range_id", sort=True).agg(
+        landlord=("landlord", "first"),
+        from_date=("from_date", "min"),
+        to_date=("to_date", "max"),
+        months=("rent", "size"),
+        days=("days", "sum"),
+        paise=("paise", "sum"),
+    ).reset_index()
+    out["rent"] = out.pop("paise").to_numpy() / 100
+    return add_amounts(out)
+
+
+# -----------------------------------
+# CLI
+# -----------------------------------
+def add_arguments(parser):
+    parser.add_argument("ranges", help="CSV of landlord,from_date,to_date[,rent] (dates YYYY-MM-DD; rent is monthly)")
+    parser.add_argument("out", help="Output CSV")
+    parser.add_argument("--consolidated", action="store_true",
+                        help="One row per range (consolidated invoice) instead of one per month")
+    parser.add_argument("--rent-overrides", help="CSV of name,period,rent overrides")
+
+
+def run(args) -> int:
+    import pandas as pd
+
+    ranges = pd.read_csv(args.ranges, dtype={"landlord": str})
+    unknown = sorted(set(ranges["landlord"]) - set(PEOPLE))
+    if unknown:
+        raise SystemExit(f"Unknown landlord(s): {', '.join(unknown)}")
+    rent_overrides = load_rent_overrides(args.rent_overrides) if args.rent_overrides else None
+
+    df = bill_ranges(ranges, rent_overrides)
+    if args.consolidated:
+        df = consolidate(df)
+    df.to_csv(args.out, index=False, date_format="%d/%m/%Y")
+    print(f"Wrote {len(df)} rows for {len(ranges)} ranges to {args.out}")
+    return 0
@@ -0,0 +1,44 @@
+from rentbill.bench import _arrears_kwargs, _invoice_kwargs
+from rentbill.core import PEOPLE, THEMES, rent_line
+from rentbill.template import get_template
+
+# -----------------------------------
+# LAYOUT CHECKS
+# -----------------------------------
+def page_checks(max_rows: int = 3) -> list[str]:
+    """
+    For every landlord and theme: a one-month invoice keeps the standard
+    signature position, and invoices of up to `max_rows` rows fit on one page.
+    Returns the problems found.
+    """
+    problems = []
+    for person_key in PEOPLE:
+        for theme_key in THEMES:
+            kw = _invoice_kwargs(person_key, theme_key)
+            tpl = get_template(kw["person"], kw["theme"])
+            items = (rent_line(kw["from_date"], kw["to_date"], kw["rent"]),)
+            if tpl.layout(items, kw["amount_words"])[3]:
+                problems.append(f"{person_key}|{theme_key}: a one-month invoice moves the signature")
+            for rows in range(1, max_rows + 1):
+                kw = _arrears_kwargs(rows, person_key)
+                _, _, pages, _ = tpl.layout(kw["items"], kw["amount_words"])
+                if len(pages) > 1:
+                    problems.append(f"{person_key}|{theme_key}: {rows} rows take {len(pages)} pages")
+    return problems
+
+
+# -----------------------------------
+# CLI: python -m rentbill check
+# -----------------------------------
+def add_arguments(parser):
+    parser.add_argument("--max-rows", type=int, default=3,
+                        help="Invoices with up to this many rows must fit on one page (default: %(default)s)")
+
+
+def run(args) -> int:
+    problems = page_checks(args.max_rows)
+    for p in problems:
+        print(p)
+    print(f"{'FAILED' if problems else 'OK'}: {len(PEOPLE)} landlords x {len(THEMES)} themes, "
+          f"up to {args.max_rows} rows, {len(problems)} problem(s)")
+    return 1 if problems else 0
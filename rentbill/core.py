@@ -0,0 +1,387 @@
+import time
+
+_import_started = time.perf_counter()
+
+import datetime
+import calendar
+import zlib
+import os
+import re
+import sys
+import threading
+from dataclasses import dataclass, replace
+from io import BytesIO
+
+from rentbill.timing import stage
+from rentbill.words import amount_to_words
+
+# reportlab is imported lazily (new_canvas / rentbill.template) so workers,
+# tests and the CLI can import this module in milliseconds.
+
+# -----------------------------------
+# DATA
+# -----------------------------------
+@dataclass(frozen=True, slots=True)
+class Person:
+    name: str
+    address_lines: tuple[str, ...]
+    pan: str
+    gst: str
+    sac: str
+    desc: str
+    location: str
+    state_code: str
+    state_name: str
+    default_rent: float
+
+
+RECIPIENT = {
+    "name": "Reliance Projects and Property Management Services Ltd,",
+    "address_lines": [
+        "89, A1 Tower, Dr Radhakrishnan Salai,",
+        "Mylapore, Chennai - 600004",
+        "Tamil Nadu",
+    ],
+    "gstin": "33AAJCR6636B1ZJ",
+}
+
+PEOPLE = {
+    "S.N.PREMA": Person(
+        name="S.N.PREMA",
+        address_lines=(
+            "10. RAMS APARTMENT,",
+            "181. TTK ROAD,",
+            "ALWARPET,",
+            "CHENNAI - 600018",
+        ),
+        pan="BXNPP2277D",
+        gst="33BXNPP2277D1ZD",
+        sac="997212",
+        desc="Rental or leasing services involving own or leased non-residential property",
+        location="SULUR, COIMBATORE - 641 402, TAMIL NADU",
+        state_code="33",
+        state_name="Tamil Nadu",
+        default_rent=223667.53,
+    ),
+    "S.N.Geetha": Person(
+        name="S.N.Geetha",
+        address_lines=(
+            "No. 5, Teesta Street, Third Main Road,",
+            "River View Housing Society, Manapakkam,",
+            "Chennai - 600125",
+        ),
+        pan="ADAPG2263N",
+        gst="33ADAPG2263N1ZQ",
+        sac="997212",
+        desc="Rental or leasing services involving own or leased non-residential property",
+        location="SULUR, COIMBATORE - 641 402, TAMIL NADU",
+        state_code="33",
+        state_name="Tamil Nadu",
+        default_rent=223667.53,
+    ),
+    "N.RAJENDRAN": Person(
+        name="N.RAJENDRAN",
+        address_lines=(
+            "No. 15, Subramaniam Layout,",
+            "Ramanathapuram,",
+            "Coimbatore - 641045",
+        ),
+        pan="BIFPR0499Q",
+        gst="33BIFPR0499Q1ZI",
+        sac="997212",
+        desc="Rental or leasing services involving own or leased non-residential property",
+        location="SULUR, COIMBATORE - 641 402, TAMIL NADU",
+        state_code="33",
+        state_name="Tamil Nadu",
+        default_rent=149112.45,
+    ),
+}
+
+THEMES = {
+    "S.N.PREMA": {  # ✅ keep EXACTLY your current blue theme
+        "primary": "#6FA8DC",
+        "secondary": "#9FC5E8",
+        "accent_dark": "#2F5E8E",
+        "light_bg": "#EEF5FF",
+        "ui_bg": "#F4F9FF",   # ✅ keep current UI background (no change for Prema)
+    },
+    "S.N.Geetha": {  # light green
+        "primary": "#7BC47F",
+        "secondary": "#B7E4C7",
+        "accent_dark": "#2D6A4F",
+        "light_bg": "#E9F7EF",
+        "ui_bg": "#F3FCF6",
+    },
+    "N.RAJENDRAN": {  # light brown
+        "primary": "#C8A27E",
+        "secondary": "#E6D2C3",
+        "accent_dark": "#7A5230",
+        "light_bg": "#F7EFE9",
+        "ui_bg": "#FBF5F0",
+    },
+}
+
+DEFAULT_THEME = dict(THEMES["S.N.PREMA"])
+
+# -----------------------------------
+# HELPERS
+# -----------------------------------
+def format_money(x: float) -> str:
+    return f"{x:,.2f}"
+
+@dataclass(frozen=True)
+class InvoiceLine:
+    """One row of the invoice table (rent for a period, maintenance, arrears, interest...)."""
+    description: str
+    amount: float
+
+def rent_line(from_date: datetime.date, to_date: datetime.date, rent: float) -> InvoiceLine:
+    return InvoiceLine(f"RENT FOR THE PERIOD {from_date.strftime('%d/%m/%Y')} TO {to_date.strftime('%d/%m/%Y')}", rent)
+
+def invoice_seq_and_fy(dt: datetime.date):
+    year, month = dt.year, dt.month
+    fy_start = year if month >= 4 else year - 1
+    fy_label = f"{fy_start}-{(fy_start + 1) % 100:02d}"
+    seq = (month - 4 + 1) if month >= 4 else (month + 9)
+    return seq, fy_label
+
+PINCODE_RE = re.compile(r"(?<!\d)(\d{3})\s*(\d{3})(?!\d)")
+SPACE_BEFORE_PUNCT_RE = re.compile(r"\s+([,\.])")
+DOT_TOKEN_RE = re.compile(r"(?<!\s)(\d+)\.\s*([A-Za-z])")
+
+def format_indian_pincode(text: str, for_html: bool = False) -> str:
+    if not text:
+        return text
+    sep = "&nbsp;" if for_html else " "
+    return PINCODE_RE.sub(rf"\1{sep}\2", text)
+
+def normalize_text_for_display(text: str, for_html: bool = False) -> str:
+    if not text:
+        return text
+    t = SPACE_BEFORE_PUNCT_RE.sub(r"\1", text)              # avoid "Society ,"
+    t = format_indian_pincode(t, for_html=for_html)         # 600125 -> 600 125 (PDF) / 600&nbsp;125 (HTML)
+    return t
+
+def registry_fingerprint() -> str:
+    """Changes whenever PEOPLE, RECIPIENT or THEMES change (i.e. a registry snapshot is installed)."""
+    from rentbill.registry import current
+
+    return current().fingerprint
+
+def theme_for(name: str) -> dict:
+    return THEMES.get(name, DEFAULT_THEME)
+
+def fy_label(y: int) -> str:
+    return f"{y}-{(y + 1) % 100:02d}"
+
+# -----------------------------------
+# PDF
+# -----------------------------------
+@dataclass(frozen=True)
+class PdfOptions:
+    # Fixed timestamp and /ID and metadata taken from the invoice itself, so
+    # identical inputs give byte-identical files (dedupe, caching, archives)
+    deterministic: bool = True
+    # zlib level for page and form streams (0-9, -1 = zlib's default)
+    compress_level: int = 9
+
+
+PDF_OPTIONS = PdfOptions(
+    deterministic=os.environ.get("RENTBILL_PDF_DETERMINISTIC", "1") != "0",
+    compress_level=int(os.environ.get("RENTBILL_PDF_COMPRESS_LEVEL", "9")),
+)
+
+def configure_pdf(**changes) -> PdfOptions:
+    """Change the process-wide PdfOptions; also exported via the environment so pool workers inherit them."""
+    global PDF_OPTIONS
+    PDF_OPTIONS = replace(PDF_OPTIONS, **changes)
+    os.environ["RENTBILL_PDF_DETERMINISTIC"] = "1" if PDF_OPTIONS.deterministic else "0"
+    os.environ["RENTBILL_PDF_COMPRESS_LEVEL"] = str(PDF_OPTIONS.compress_level)
+    return PDF_OPTIONS
+
+def new_canvas(dest, options: PdfOptions | None = None):
+    """A4 reportlab canvas writing to a path or binary file object."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    options = options or PDF_OPTIONS
+    c = canvas.Canvas(dest, pagesize=A4, invariant=1 if options.deterministic else 0)
+    c.setCreator("rentbill")
+    return c
+
+class _Flate:
+    pdfname = "FlateDecode"
+
+    def __init__(self, level: int):
+        self.level = level
+
+    def encode(self, text):
+        return zlib.compress(text.encode("utf8") if isinstance(text, str) else text, self.level)
+
+    def decode(self, encoded):
+        return zlib.decompress(encoded)
+
+_flate_filters = {}
+_save_lock = threading.Lock()
+
+def save_canvas(c, options: PdfOptions | None = None) -> None:
+    """
+    c.save() with the configured compression level. reportlab picks the
+    stream filter from a module global while saving, so saves are
+    serialised and the global is swapped only for the duration of one.
+    """
+    from reportlab.pdfbase import pdfdoc
+
+    options = options or PDF_OPTIONS
+    flate = _flate_filters.get(options.compress_level)
+    if flate is None:
+        flate = _flate_filters[options.compress_level] = _Flate(options.compress_level)
+    with stage("pdf.save"), _save_lock:
+        default = pdfdoc.PDFZCompress
+        pdfdoc.PDFZCompress = flate
+        try:
+            c.save()
+        finally:
+            pdfdoc.PDFZCompress = default
+
+def draw_invoice_page(
+    c,
+    person: Person,
+    invoice_no: str,
+    invoice_date: datetime.date,
+    from_date: datetime.date,
+    to_date: datetime.date,
+    rent: float,
+    sgst: float,
+    cgst: float,
+    total: float,
+    amount_words: str,
+    theme: dict,
+    items: tuple[InvoiceLine, ...] | None = None,
+    recipient: dict | None = None
+) -> None:
+    """Draw one invoice (one or more pages, when `items` overflow the table)."""
+    from rentbill.template import get_template
+
+    get_template(person, theme, recipient).draw(
+        c,
+        invoice_no=invoice_no,
+        invoice_date=invoice_date,
+        from_date=from_date,
+        to_date=to_date,
+        rent=rent,
+        sgst=sgst,
+        cgst=cgst,
+        total=total,
+        amount_words=amount_words,
+        items=items,
+    )
+    with stage("pdf.show_page"):
+        c.showPage()
+
+def write_invoice_pdf(fileobj, options: PdfOptions | None = None, **invoice) -> None:
+    """Render one invoice straight into a binary file object (no intermediate copy)."""
+    c = new_canvas(fileobj, options)
+    c.setTitle(f"Tax Invoice {invoice['invoice_no']}")
+    c.setAuthor(invoice["person"].name)
+    c.setSubject(f"{invoice['from_date'].isoformat()} to {invoice['to_date'].isoformat()}")
+    draw_invoice_page(c, **invoice)
+    save_canvas(c, options)
+
+def make_invoice_pdf(
+    person: Person,
+    invoice_no: str,
+    invoice_date: datetime.date,
+    from_date: datetime.date,
+    to_date: datetime.date,
+    rent: float,
+    sgst: float,
+    cgst: float,
+    total: float,
+    amount_words: str,
+    theme: dict,
+    items: tuple[InvoiceLine, ...] | None = None,
+    recipient: dict | None = None,
+    options: PdfOptions | None = None
+) -> bytes:
+    """
+    `items` replaces the single rent row with N table rows; `rent` is then
+    their sum (see invoice_totals). Rows flow onto extra pages as needed.
+    `recipient` (name, address_lines, gstin) defaults to RECIPIENT; for a
+    lease, pass its tenant and the landlord from Registry.lease_parties().
+    `options` defaults to the process-wide PDF_OPTIONS.
+    """
+    buf = BytesIO()
+    write_invoice_pdf(
+        buf,
+        person=person,
+        invoice_no=invoice_no,
+        invoice_date=invoice_date,
+        from_date=from_date,
+        to_date=to_date,
+        rent=rent,
+        sgst=sgst,
+        cgst=cgst,
+        total=total,
+        amount_words=amount_words,
+        theme=theme,
+        items=items,
+        recipient=recipient,
+        options=options,
+    )
+    return buf.getvalue()
+
+
+# -----------------------------------
+# PERIODS / AMOUNTS
+# -----------------------------------
+# Always start FY from 2026-27
+FY_START_BASE = 2026
+fy_starts = list(range(FY_START_BASE, FY_START_BASE + 10))
+
+fy_months = [
+    ("April", 4), ("May", 5), ("June", 6), ("July", 7), ("August", 8), ("September", 9),
+    ("October", 10), ("November", 11), ("December", 12),
+    ("January", 1), ("February", 2), ("March", 3),
+]
+
+def month_period(fy_start: int, month_num: int):
+    myear = fy_start if month_num >= 4 else fy_start + 1
+    last_day = calendar.monthrange(myear, month_num)[1]
+    return datetime.date(myear, month_num, 1), datetime.date(myear, month_num, last_day)
+
+def default_invoice_no_for(invoice_date: datetime.date) -> str:
+    seq, fy_lbl = invoice_seq_and_fy(invoice_date)
+    return f"{seq:02d} / {fy_lbl}"
+
+def invoice_amounts(rent: float):
+    sgst = round(rent * 0.09, 2)
+    cgst = round(rent * 0.09, 2)
+    total = round(rent + sgst + cgst, 2)
+    amount_words = amount_to_words(total)
+    return sgst, cgst, total, amount_words
+
+def invoice_totals(items):
+    """(taxable, sgst, cgst, total, amount_words) over all rows, with GST applied once to the sum."""
+    # Summed in paise so the total is exact and order-independent
+    taxable = sum(round(i.amount * 100) for i in items) / 100
+    return (taxable, *invoice_amounts(taxable))
+
+def invoice_file_name(person: Person, invoice_date: datetime.date, series: str = "") -> str:
+    name = (person.name + (f"_{series}" if series else "")).replace(' ', '_')
+    return f"TaxInvoice_{name}_{invoice_date.strftime('%Y%m')}.pdf"
+
+
+# -----------------------------------
+# IMPORT-TIME HOOK
+# -----------------------------------
+IMPORT_SECONDS = time.perf_counter() - _import_started
+
+def import_report() -> dict:
+    """How long this module took to import, and which heavy dependencies are loaded so far."""
+    return {
+        "core_import_ms": IMPORT_SECONDS * 1000,
+        "reportlab_loaded": "reportlab" in sys.modules,
+        "pandas_loaded": "pandas" in sys.modules,
+        "streamlit_loaded": "streamlit" in sys.modules,
+    }
@@ -0,0 +1,275 @@
+import csv
+import os
+from dataclasses import dataclass
+
+from rentbill.batch import job_ledger_entry, plan_jobs, plan_lease_jobs
+from rentbill.core import PEOPLE, fy_label, fy_starts
+from rentbill.ledger import InvoiceLedger, LedgerEntry
+
+# -----------------------------------
+# SOURCES (issued invoices in FY, month order)
+# -----------------------------------
+def ledger_entries(ledger: InvoiceLedger, fy_from: int | None = None, fy_to: int | None = None, landlords=None,
+                   chunk_size: int = 1000):
+    """Invoices recorded in `ledger`. A re-issue (same landlord and invoice number) replaces the earlier entry."""
+    last = None
+    for e in ledger.iter_invoices(
+        fy_label(fy_from) if fy_from is not None else None,
+        fy_label(fy_to) if fy_to is not None else None,
+        landlords,
+        chunk_size,
+    ):
+        if last is not None and (last.landlord, last.invoice_no) != (e.landlord, e.invoice_no):
+            yield last
+        last = e
+    if last is not None:
+        yield last
+
+
+def planned_entries(fy_range=None, person_keys=None, leases: bool = False):
+    """The invoices `python -m rentbill batch` would issue, planned one FY at a time."""
+    plan = plan_lease_jobs if leases else plan_jobs
+    for fy_start in (fy_range or fy_starts):
+        for job in plan(person_keys=person_keys, fy_range=[fy_start]):
+            yield job_ledger_entry(job)
+
+
+# -----------------------------------
+# REGISTER (streaming aggregation)
+# -----------------------------------
+MONEY = ("Taxable Value", "SGST", "CGST", "Total")
+
+# table -> [(column, kind)]; kind is str / int / date / money
+TABLES = {
+    "invoices": [("Landlord", "str"), ("GSTIN", "str"), ("FY", "str"), ("Month", "str"), ("Invoice No", "str"),
+                 ("Invoice Date", "date"), ("Recipient GSTIN", "str"), ("Place of Supply", "str"), ("Lease", "str"),
+                 ("From", "date"), ("To", "date"), *((m, "money") for m in MONEY)],
+    "landlord_month": [("Landlord", "str"), ("GSTIN", "str"), ("FY", "str"), ("Month", "str"), ("Invoices", "int"),
+                       *((m, "money") for m in MONEY)],
+    "landlord_fy": [("Landlord", "str"), ("GSTIN", "str"), ("FY", "str"), ("Invoices", "int"),
+                    *((m, "money") for m in MONEY)],
+    "fy": [("FY", "str"), ("Landlords", "int"), ("Invoices", "int"), *((m, "money") for m in MONEY)],
+}
+
+
+@dataclass
+class GstTotals:
+    """Running sums in paise, so totals are exact whatever the order they arrive in."""
+    invoices: int = 0
+    taxable: int = 0
+    sgst: int = 0
+    cgst: int = 0
+    total: int = 0
+
+    def add(self, e: LedgerEntry) -> None:
+        self.invoices += 1
+        self.taxable += round(e.rent * 100)
+        self.sgst += round(e.sgst * 100)
+        self.cgst += round(e.cgst * 100)
+        self.total += round(e.total * 100)
+
+    def merge(self, other: "GstTotals") -> None:
+        self.invoices += other.invoices
+        self.taxable += other.taxable
+        self.sgst += other.sgst
+        self.cgst += other.cgst
+        self.total += other.total
+
+    def amounts(self) -> list[float]:
+        return [self.taxable / 100, self.sgst / 100, self.cgst / 100, self.total / 100]
+
+
+def _gstin(landlord: str) -> str:
+    person = PEOPLE.get(landlord)
+    return person.gst if person is not None else ""
+
+
+def gst_register(entries):
+    """
+    Yield (table, row) for the TABLES above from `entries` in FY and month
+    order (as both sources produce them). Rows are emitted as each month /
+    FY closes, sorted by landlord, so memory is bounded by one month of the
+    portfolio, not the years of history.
+    """
+    fy = month = None
+    invoices, monthly, annual = [], {}, {}
+
+    def close_month():
+        invoices.sort(key=lambda row: (row[0], row[4]))
+        for row in invoices:
+            yield "invoices", row
+        invoices.clear()
+        for landlord in sorted(monthly):
+            t = monthly[landlord]
+            yield "landlord_month", [landlord, _gstin(landlord), fy, month, t.invoices, *t.amounts()]
+        monthly.clear()
+
+    def close_fy():
+        portfolio = GstTotals()
+        for landlord in sorted(annual):
+            t = annual[landlord]
+            portfolio.merge(t)
+            yield "landlord_fy", [landlord, _gstin(landlord), fy, t.invoices, *t.amounts()]
+        yield "fy", [fy, len(annual), portfolio.invoices, *portfolio.amounts()]
+        annual.clear()
+
+    for e in entries:
+        e_month = e.invoice_date.strftime("%Y-%m")
+        if (e.fy, e_month) != (fy, month):
+            if fy is not None and (e.fy, e_month) < (fy, month):
+                raise ValueError(f"Entries must come in FY and month order ({e.invoice_no} of {e.landlord} is late)")
+            if fy is not None:
+                yield from close_month()
+                if e.fy != fy:
+                    yield from close_fy()
+            fy, month = e.fy, e_month
+        invoices.append([e.landlord, _gstin(e.landlord), e.fy, e_month, e.invoice_no, e.invoice_date,
+                         e.recipient_gstin, e.place_of_supply, e.lease_id or "",
+                         e.period_from, e.period_to, e.rent, e.sgst, e.cgst, e.total])
+        monthly.setdefault(e.landlord, GstTotals()).add(e)
+        annual.setdefault(e.landlord, GstTotals()).add(e)
+    if fy is not None:
+        yield from close_month()
+        yield from close_fy()
+
+
+# -----------------------------------
+# OUTPUT
+# -----------------------------------
+class CsvSink:
+    """<out_dir>/<table>.csv, ISO dates."""
+
+    def __init__(self, out_dir: str):
+        self._files, self._writers = [], {}
+        for table, columns in TABLES.items():
+            f = open(os.path.join(out_dir, f"{table}.csv"), "w", newline="", encoding="utf-8")
+            self._files.append(f)
+            self._writers[table] = csv.writer(f)
+            self._writers[table].writerow([name for name, _ in columns])
+
+    def write(self, table: str, row: list) -> None:
+        self._writers[table].writerow(row)
+
+    def close(self) -> None:
+        for f in self._files:
+            f.close()
+
+
+class XlsxSink:
+    """<out_dir>/gst_register.xlsx, one sheet per table (openpyxl write-only mode streams rows to disk)."""
+
+    def __init__(self, out_dir: str):
+        try:
+            from openpyxl import Workbook
+        except ImportError as e:
+            raise ImportError("Excel output needs openpyxl (pip install openpyxl)") from e
+
+        self.path = os.path.join(out_dir, "gst_register.xlsx")
+        self._book = Workbook(write_only=True)
+        self._sheets = {}
+        for table, columns in TABLES.items():
+            self._sheets[table] = self._book.create_sheet(table)
+            self._sheets[table].append([name for name, _ in columns])
+
+    def write(self, table: str, row: list) -> None:
+        self._sheets[table].append(row)
+
+    def close(self) -> None:
+        self._book.save(self.path)
+
+
+class ParquetSink:
+    """<out_dir>/<table>.parquet, written in row groups of `chunk_rows`."""
+
+    def __init__(self, out_dir: str, chunk_rows: int = 10000):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet output needs pyarrow (pip install pyarrow)") from e
+
+        types = {"str": pa.string(), "int": pa.int64(), "date": pa.date32(), "money": pa.float64()}
+        self._pa = pa
+        self.chunk_rows = chunk_rows
+        self._schemas, self._writers, self._buffers = {}, {}, {}
+        for table, columns in TABLES.items():
+            schema = pa.schema([(name, types[kind]) for name, kind in columns])
+            self._schemas[table] = schema
+            self._writers[table] = pq.ParquetWriter(os.path.join(out_dir, f"{table}.parquet"), schema)
+            self._buffers[table] = []
+
+    def _flush(self, table: str) -> None:
+        rows = self._buffers[table]
+        if rows:
+            schema = self._schemas[table]
+            columns = [self._pa.array(col, type=field.type) for col, field in zip(zip(*rows), schema)]
+            self._writers[table].write_table(self._pa.Table.from_arrays(columns, schema=schema))
+            rows.clear()
+
+    def write(self, table: str, row: list) -> None:
+        self._buffers[table].append(row)
+        if len(self._buffers[table]) >= self.chunk_rows:
+            self._flush(table)
+
+    def close(self) -> None:
+        for table, writer in self._writers.items():
+            self._flush(table)
+            writer.close()
+
+
+SINKS = {"csv": CsvSink, "xlsx": XlsxSink, "parquet": ParquetSink}
+
+
+def export_register(entries, out_dir: str, fmt: str = "csv") -> dict:
+    """Stream the register for `entries` into `out_dir`. Returns row counts per table and the (small) FY table."""
+    os.makedirs(out_dir, exist_ok=True)
+    sink = SINKS[fmt](out_dir)
+    counts = dict.fromkeys(TABLES, 0)
+    fy_rows = []
+    try:
+        for table, row in gst_register(entries):
+            sink.write(table, row)
+            counts[table] += 1
+            if table == "fy":
+                fy_rows.append(row)
+    finally:
+        sink.close()
+    return {"counts": counts, "fy": fy_rows}
+
+
+# -----------------------------------
+# CLI: python -m rentbill gst
+# -----------------------------------
+def add_arguments(parser):
+    parser.add_argument("out", help="Output directory")
+    parser.add_argument("--ledger", help="SQLite invoice ledger to read (default: regenerate from the period index)")
+    parser.add_argument("--fy-from", type=int, default=fy_starts[0], help="First FY start year (default: %(default)s)")
+    parser.add_argument("--fy-to", type=int, default=None, help="Last FY start year, inclusive (default: same as --fy-from)")
+    parser.add_argument("--name", action="append", choices=list(PEOPLE.keys()), help="Landlord to include (repeatable; default: all)")
+    parser.add_argument("--leases", action="store_true",
+                        help="Without --ledger: one invoice per active lease (see `batch --leases`)")
+    parser.add_argument("--format", choices=list(SINKS), default="csv", help="Output format (default: %(default)s)")
+
+
+def run(args) -> int:
+    fy_to = args.fy_to if args.fy_to is not None else args.fy_from
+    if fy_to < args.fy_from:
+        raise SystemExit("--fy-to must not be earlier than --fy-from")
+    if args.ledger and args.leases:
+        raise SystemExit("--leases applies only without --ledger")
+
+    try:
+        if args.ledger:
+            with InvoiceLedger(args.ledger) as ledger:
+                result = export_register(ledger_entries(ledger, args.fy_from, fy_to, args.name), args.out, args.format)
+        else:
+            entries = planned_entries(range(args.fy_from, fy_to + 1), args.name, args.leases)
+            result = export_register(entries, args.out, args.format)
+    except ImportError as e:
+        raise SystemExit(str(e))
+
+    for fy, landlords, invoices, taxable, sgst, cgst, total in result["fy"]:
+        print(f"{fy}: {landlords} landlords, {invoices} invoices, taxable {taxable:,.2f}, "
+              f"SGST {sgst:,.2f}, CGST {cgst:,.2f}, total {total:,.2f}")
+    print(f"Wrote {', '.join(f'{n} {table}' for table, n in result['counts'].items())} rows to {args.out}")
+    return 0
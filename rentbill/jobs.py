@@ -0,0 +1,362 @@
+import datetime
+import json
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+
+from rentbill import batch
+from rentbill.core import PEOPLE
+
+# -----------------------------------
+# JOB STORE (SQLite)
+# -----------------------------------
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id           TEXT    PRIMARY KEY,
+    params       TEXT    NOT NULL,
+    status       TEXT    NOT NULL,
+    total        INTEGER NOT NULL DEFAULT 0,
+    done         INTEGER NOT NULL DEFAULT 0,
+    failed       INTEGER NOT NULL DEFAULT 0,
+    error        TEXT,
+    result_path  TEXT,
+    created_at   TEXT    NOT NULL,
+    started_at   TEXT,
+    finished_at  TEXT,
+    owner        TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_created_at ON jobs (created_at);
+"""
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+# Columns added after the first release; job stores created before them get them on open
+ADDED_COLUMNS = {
+    "owner": "TEXT",
+    "cancel_requested": "INTEGER NOT NULL DEFAULT 0",
+}
+
+
+@dataclass
+class JobStatus:
+    id: str
+    params: dict
+    status: str
+    total: int
+    done: int  # rendered so far, including failures
+    failed: int
+    error: str | None
+    result_path: str | None
+    created_at: datetime.datetime
+    started_at: datetime.datetime | None = None
+    finished_at: datetime.datetime | None = None
+    owner: str | None = None
+    cancel_requested: bool = False
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    @property
+    def progress(self) -> float:
+        if self.total:
+            return self.done / self.total
+        return 1.0 if self.finished else 0.0
+
+
+_TIME_COLUMNS = ("created_at", "started_at", "finished_at")
+
+
+def _boot_id() -> str:
+    try:
+        with open("/proc/sys/kernel/random/boot_id") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def _start_time(pid: int) -> str:
+    """Start time of `pid` in clock ticks since boot (Linux), "" where /proc can't say."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # Field 22; the command name before it is in parentheses and may hold spaces
+            return f.read().rpartition(")")[2].split()[19]
+    except (OSError, IndexError):
+        return ""
+
+
+# "<boot id>:<pid>:<start time>" of the process running a job. The jobs dir
+# is shared by every app / server process on the host, so each only fails
+# jobs whose owner is gone; the start time tells a reused PID from the owner.
+OWNER = f"{_boot_id()}:{os.getpid()}:{_start_time(os.getpid())}"
+
+
+def owner_alive(owner: str | None) -> bool:
+    if not owner:
+        return False  # recorded before jobs had owners
+    boot, pid, started = (owner.split(":") + [""])[:3]  # owners recorded before start times have two parts
+    if boot != OWNER.split(":")[0]:
+        return False  # the machine has rebooted since
+    if os.name != "posix":
+        return True  # no signal-0 probe; leave the job to its owner
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    if started and _start_time(int(pid)) not in ("", started):
+        return False  # the PID now belongs to another process
+    return True
+
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+def _from_row(row: sqlite3.Row) -> JobStatus:
+    d = dict(row)
+    d["params"] = json.loads(d["params"])
+    d["cancel_requested"] = bool(d["cancel_requested"])
+    for k in _TIME_COLUMNS:
+        d[k] = datetime.datetime.fromisoformat(d[k]) if d[k] else None
+    return JobStatus(**d)
+
+
+class JobStore:
+    """Job rows shared by the runner threads and every Streamlit session (one connection, one lock)."""
+
+    _columns = {f.name for f in fields(JobStatus)}
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self.conn:
+            self.conn.executescript(SCHEMA)
+            have = {r["name"] for r in self.conn.execute("PRAGMA table_info(jobs)")}
+            for name, decl in ADDED_COLUMNS.items():
+                if name not in have:
+                    self.conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {decl}")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def create(self, params: dict) -> str:
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO jobs (id, params, status, created_at, owner) VALUES (?, ?, ?, ?, ?)",
+                (job_id, json.dumps(params), QUEUED, _now(), OWNER),
+            )
+        return job_id
+
+    def update(self, job_id: str, **changes) -> None:
+        unknown = set(changes) - self._columns
+        if unknown:
+            raise ValueError(f"Unknown job fields: {', '.join(sorted(unknown))}")
+        with self._lock, self.conn:
+            self.conn.execute(
+                f"UPDATE jobs SET {', '.join(f'{k} = ?' for k in changes)} WHERE id = ?",
+                (*changes.values(), job_id),
+            )
+
+    def get(self, job_id: str) -> JobStatus | None:
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _from_row(row) if row is not None else None
+
+    def recent(self, limit: int = 20) -> list[JobStatus]:
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM jobs ORDER BY created_at DESC, rowid DESC LIMIT ?", (limit,)).fetchall()
+        return [_from_row(r) for r in rows]
+
+    def request_cancel(self, job_id: str) -> bool:
+        """
+        Flag a queued or running job for cancelling; its runner, in whichever
+        process, polls the flag. A job whose owner has exited is cancelled
+        here. False if the job is unknown or already finished.
+        """
+        placeholders = ", ".join("?" * len(FINISHED))
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                f"SELECT owner FROM jobs WHERE id = ? AND status NOT IN ({placeholders})", (job_id, *FINISHED)
+            ).fetchone()
+            if row is None:
+                return False
+            if owner_alive(row["owner"]):
+                self.conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+            else:
+                self.conn.execute(
+                    "UPDATE jobs SET cancel_requested = 1, status = ?, finished_at = ? WHERE id = ?",
+                    (CANCELLED, _now(), job_id),
+                )
+        return True
+
+    def cancel_requested(self, job_id: str) -> bool:
+        with self._lock:
+            row = self.conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def mark_interrupted(self) -> int:
+        """Jobs left queued/running by a process that has exited will never finish; fail them."""
+        with self._lock, self.conn:
+            rows = self.conn.execute("SELECT id, owner FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)).fetchall()
+            dead = [(r["id"],) for r in rows if not owner_alive(r["owner"])]
+            self.conn.executemany(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                [(FAILED, "Interrupted: the process running it exited", _now(), job_id) for (job_id,) in dead],
+            )
+        return len(dead)
+
+    def prune(self, max_age_days: float) -> int:
+        """Delete finished jobs (and their ZIPs) older than `max_age_days`."""
+        cutoff = (datetime.datetime.now() - datetime.timedelta(days=max_age_days)).isoformat(timespec="seconds")
+        placeholders = ", ".join("?" * len(FINISHED))
+        with self._lock, self.conn:
+            rows = self.conn.execute(
+                f"SELECT id, result_path FROM jobs WHERE created_at < ? AND status IN ({placeholders})",
+                (cutoff, *FINISHED),
+            ).fetchall()
+            for r in rows:
+                if r["result_path"] and os.path.exists(r["result_path"]):
+                    os.remove(r["result_path"])
+            self.conn.executemany("DELETE FROM jobs WHERE id = ?", [(r["id"],) for r in rows])
+        return len(rows)
+
+
+# -----------------------------------
+# JOB QUEUE
+# -----------------------------------
+class _Cancelled(Exception):
+    pass
+
+
+def plan(params: dict) -> list[batch.InvoiceJob]:
+    fy_range = range(params["fy_from"], params["fy_to"] + 1)
+    if params.get("leases"):
+        return batch.plan_lease_jobs(person_keys=params.get("names"), fy_range=fy_range)
+    return batch.plan_jobs(person_keys=params.get("names"), fy_range=fy_range)
+
+
+class JobQueue:
+    """
+    Bulk invoice runs on background threads (`slots` at a time), each
+    rendering on its own process pool into a ZIP under `jobs_dir`. Status
+    and progress live in a JobStore, so any session, or the same browser
+    after a refresh, can look a job up by id while it runs. Workers are
+    spawned rather than forked, since the caller is usually a threaded server.
+    """
+
+    def __init__(self, jobs_dir: str, slots: int = 1, workers: int | None = None,
+                 progress_interval: float = 0.5, keep_days: float = 7):
+        os.makedirs(jobs_dir, exist_ok=True)
+        self.jobs_dir = jobs_dir
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.progress_interval = progress_interval
+        self.store = JobStore(os.path.join(jobs_dir, "jobs.sqlite"))
+        self.store.mark_interrupted()
+        self.store.prune(keep_days)
+        self._mp_context = multiprocessing.get_context("spawn")
+        self._threads = ThreadPoolExecutor(max_workers=slots, thread_name_prefix="rentbill-job")
+        self._cancel = {}
+
+    def submit(self, fy_from: int, fy_to: int | None = None, names=None, leases: bool = False) -> str:
+        """Queue a bulk run (same choices as `python -m rentbill batch`); returns the job id."""
+        fy_to = fy_from if fy_to is None else fy_to
+        if fy_to < fy_from:
+            raise ValueError("fy_to must not be earlier than fy_from")
+        unknown = sorted(set(names or ()) - set(PEOPLE))
+        if unknown:
+            raise ValueError(f"Unknown landlord(s): {', '.join(unknown)}")
+        params = {"fy_from": int(fy_from), "fy_to": int(fy_to), "names": list(names or []), "leases": bool(leases)}
+        job_id = self.store.create(params)
+        self._cancel[job_id] = threading.Event()
+        self._threads.submit(self._run, job_id, params)
+        return job_id
+
+    def status(self, job_id: str) -> JobStatus | None:
+        return self.store.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Ask a queued or running job to stop, from any process sharing the
+        jobs dir; it finishes its in-flight chunks first. False if the job is
+        unknown or already finished.
+        """
+        event = self._cancel.get(job_id)
+        if event is not None:
+            event.set()  # ours: stop without waiting for the next poll
+        return self.store.request_cancel(job_id)
+
+    def shutdown(self) -> None:
+        for event in list(self._cancel.values()):
+            event.set()
+        self._threads.shutdown(wait=True)
+        self.store.close()
+
+    def _run(self, job_id: str, params: dict) -> None:
+        cancel = self._cancel[job_id]
+        path = os.path.join(self.jobs_dir, f"{job_id}.zip")
+        part = path + ".part"
+        counts = {"done": 0, "failed": 0}
+
+        def track(results):
+            last = time.monotonic()
+            for r in results:
+                if cancel.is_set():
+                    raise _Cancelled()
+                counts["done"] += 1
+                if not r.ok:
+                    counts["failed"] += 1
+                if time.monotonic() - last >= self.progress_interval:
+                    self.store.update(job_id, **counts)
+                    if self.store.cancel_requested(job_id):  # set by another process
+                        cancel.set()
+                    last = time.monotonic()
+                yield r
+
+        try:
+            if cancel.is_set() or self.store.cancel_requested(job_id):
+                raise _Cancelled()
+            jobs = plan(params)
+            self.store.update(job_id, status=RUNNING, total=len(jobs), started_at=_now())
+            results = batch.iter_render(jobs, workers=self.workers, mp_context=self._mp_context)
+            failed = batch.write_zip(track(results), part)
+            os.replace(part, path)
+            error = "; ".join(f"{r.job.arcname}: {r.error}" for r in failed[:5]) or None
+            self.store.update(job_id, status=DONE, **counts, error=error, result_path=path, finished_at=_now())
+        except _Cancelled:
+            self.store.update(job_id, status=CANCELLED, **counts, finished_at=_now())
+        except Exception as e:
+            self.store.update(job_id, status=FAILED, **counts, error=f"{type(e).__name__}: {e}", finished_at=_now())
+        finally:
+            self._cancel.pop(job_id, None)
+            if os.path.exists(part):
+                os.remove(part)
+
+
+# Process-wide, like the PDF caches: one queue per server process, shared by
+# every session and surviving reruns.
+JOBS_DIR_ENV = "RENTBILL_JOBS_DIR"
+
+_default_queue = None
+_default_lock = threading.Lock()
+
+
+def default_queue() -> JobQueue:
+    global _default_queue
+    with _default_lock:
+        if _default_queue is None:
+            jobs_dir = os.environ.get(JOBS_DIR_ENV) or os.path.join(tempfile.gettempdir(), "rentbill-jobs")
+            _default_queue = JobQueue(jobs_dir)
+        return _default_queue
@@ -0,0 +1,118 @@
+import re
+from functools import lru_cache
+
+from reportlab.lib.rl_accel import unicode2T1
+from reportlab.pdfbase.pdfmetrics import getFont
+
+from rentbill.core import PINCODE_RE
+
+# -----------------------------------
+# TEXT MEASUREMENT
+# -----------------------------------
+# Widths are kept in font units (1/1000 em, integers for the Type 1 fonts we
+# use) and scaled the same way reportlab's stringWidth does, so every
+# `<= max_w` decision matches c.stringWidth exactly.
+_glyph_tables = {}
+
+
+def glyph_table(font_name: str) -> dict:
+    """char -> width in font units for `font_name`, filled in on first use of each char."""
+    table = _glyph_tables.get(font_name)
+    if table is None:
+        table = _glyph_tables[font_name] = {}
+    return table
+
+
+def _glyph_units(font_name: str, ch: str) -> int:
+    table = glyph_table(font_name)
+    units = table.get(ch)
+    if units is None:
+        font = getFont(font_name)
+        units = table[ch] = sum(
+            sum(map(f.widths.__getitem__, t)) for f, t in unicode2T1(ch, [font] + font.substitutionFonts)
+        )
+    return units
+
+
+@lru_cache(maxsize=8192)
+def text_units(text: str, font_name: str) -> int:
+    return sum(_glyph_units(font_name, ch) for ch in text)
+
+
+def units_to_points(units: int, font_size: float) -> float:
+    return units * 0.001 * font_size
+
+
+def string_width(text: str, font_name: str, font_size: float) -> float:
+    """Same result as pdfmetrics.stringWidth, from the cached glyph tables."""
+    return units_to_points(text_units(text, font_name), font_size)
+
+
+# -----------------------------------
+# LINE WRAP
+# -----------------------------------
+DOT_JOIN_RE = re.compile(r"(\d+)\.\s*([A-Za-z])")
+HYPHEN_RE = re.compile(r"\s*-\s*")
+
+
+def _fill_lines(words, font_name, font_size, max_w) -> list[str]:
+    """Greedy line fill; widths accumulate word by word instead of re-measuring the whole line."""
+    space = _glyph_units(font_name, " ")
+    lines = []
+    cur = ""
+    cur_units = 0
+
+    for w in words:
+        w_units = text_units(w, font_name)
+        test_units = cur_units + space + w_units if cur else w_units
+        if units_to_points(test_units, font_size) <= max_w:
+            cur = cur + " " + w if cur else w
+            cur_units = test_units
+        elif cur:
+            lines.append(cur)
+            cur, cur_units = w, w_units
+        else:
+            # Single "word" longer than max width (rare) -> hard split
+            chunk, chunk_units = "", 0
+            for ch in w:
+                ch_units = _glyph_units(font_name, ch)
+                if units_to_points(chunk_units + ch_units, font_size) <= max_w:
+                    chunk += ch
+                    chunk_units += ch_units
+                else:
+                    lines.append(chunk)
+                    chunk, chunk_units = ch, ch_units
+            cur, cur_units = chunk, chunk_units
+
+    if cur:
+        lines.append(cur)
+    return lines
+
+
+@lru_cache(maxsize=4096)
+def wrap_lines(text_in, font_name, font_size, max_w) -> tuple:
+    s = (text_in or "").strip()
+
+    # Protect pincodes so 600 018 never splits
+    s = PINCODE_RE.sub(r"\1~\2", s)
+
+    # Normalize "181. TTK" -> "181.TTK" (avoid odd breaks)
+    s = DOT_JOIN_RE.sub(r"\1.\2", s)
+
+    # Encourage wrapping at commas and hyphens by ensuring spaces after them
+    s = s.replace(",", ", ")
+    s = HYPHEN_RE.sub(" - ", s)
+
+    # Restore pin protection
+    return tuple(ln.replace("~", " ") for ln in _fill_lines(s.split(), font_name, font_size, max_w))
+
+
+@lru_cache(maxsize=4096)
+def wrap_words(text_in, font_name, font_size, max_w) -> tuple:
+    """Plain word wrap that leaves the text as written (table row descriptions)."""
+    return tuple(_fill_lines((text_in or "").split(), font_name, font_size, max_w))
+
+
+# IMPORTANT: protect pincodes in wrapping so "600 125" doesn't split into 2 lines
+def wrap_text(text_in, font_name, font_size, max_w) -> list[str]:
+    return list(wrap_lines(text_in, font_name, font_size, max_w))
@@ -0,0 +1,119 @@
+import datetime
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, replace
+
+from rentbill.core import Person
+from rentbill.periods import Period
+
+# -----------------------------------
+# PROPERTIES / LEASES
+# -----------------------------------
+@dataclass(frozen=True, slots=True)
+class Property:
+    id: str
+    location: str
+    state_code: str
+    state_name: str
+
+
+@dataclass(frozen=True, slots=True)
+class Lease:
+    """Landlord x property x tenant at a monthly rent, from `start` to `end` (inclusive; None = open-ended)."""
+    id: str
+    landlord: str  # PEOPLE key
+    property_id: str
+    tenant: str  # recipient name
+    rent: float
+    start: datetime.date
+    end: datetime.date | None = None
+    # Invoice-number prefix; needed when a landlord has several leases at once
+    series: str = ""
+
+    def overlaps(self, from_date: datetime.date, to_date: datetime.date) -> bool:
+        return self.start <= to_date and (self.end is None or self.end >= from_date)
+
+    def invoice_no(self, period: Period) -> str:
+        return f"{self.series}-{period.invoice_no}" if self.series else period.invoice_no
+
+
+def lease_person(person: Person, prop: Property) -> Person:
+    """The landlord as printed on this property's invoices (service location from the property)."""
+    return replace(person, location=prop.location, state_code=prop.state_code, state_name=prop.state_name)
+
+
+def _start_order(lease: Lease):
+    return lease.start, lease.id
+
+
+class LeaseIndex:
+    """
+    Leases by id, landlord, tenant and property, plus an interval index for
+    "which leases overlap this period". Open-ended leases are kept sorted by
+    start and ended ones by end, so a query only walks leases that are still
+    running at `from_date`, not the whole history. Results come back oldest
+    first; leases are tracked by their position in that order so merging
+    the two halves is an int sort.
+    """
+
+    def __init__(self, leases):
+        self._by_start = sorted(leases, key=_start_order)
+        self.leases = {}
+        by_landlord, by_tenant, by_property = {}, {}, {}
+        for lease in self._by_start:
+            self.leases[lease.id] = lease
+            by_landlord.setdefault(lease.landlord, []).append(lease)
+            by_tenant.setdefault(lease.tenant, []).append(lease)
+            by_property.setdefault(lease.property_id, []).append(lease)
+        self.by_landlord = {k: tuple(v) for k, v in by_landlord.items()}
+        self.by_tenant = {k: tuple(v) for k, v in by_tenant.items()}
+        self.by_property = {k: tuple(v) for k, v in by_property.items()}
+
+        self._open_pos = [i for i, lease in enumerate(self._by_start) if lease.end is None]
+        self._open_starts = [self._by_start[i].start for i in self._open_pos]
+        ended = sorted((lease.end, i) for i, lease in enumerate(self._by_start) if lease.end is not None)
+        self._ends = [end for end, _ in ended]
+        self._ended_pos = [i for _, i in ended]
+        self._ended_starts = [self._by_start[i].start for i in self._ended_pos]
+
+    def __len__(self) -> int:
+        return len(self.leases)
+
+    def active(self, from_date: datetime.date, to_date: datetime.date, landlord: str | None = None) -> tuple[Lease, ...]:
+        """Leases overlapping from_date..to_date (inclusive), oldest first."""
+        if landlord is not None:
+            return tuple(x for x in self.by_landlord.get(landlord, ()) if x.overlaps(from_date, to_date))
+        pos = self._open_pos[:bisect_right(self._open_starts, to_date)]
+        i = bisect_left(self._ends, from_date)
+        pos += [p for p, start in zip(self._ended_pos[i:], self._ended_starts[i:]) if start <= to_date]
+        pos.sort()
+        by_start = self._by_start
+        return tuple(by_start[p] for p in pos)
+
+    def for_period(self, period: Period, landlord: str | None = None) -> tuple[Lease, ...]:
+        return self.active(period.from_date, period.to_date, landlord)
+
+
+def _month(d: datetime.date) -> tuple[int, int]:
+    return d.year, d.month
+
+
+def series_clashes(leases) -> list[str]:
+    """
+    Leases of one landlord with the same series that bill in a common
+    calendar month. Invoice numbers and file names are per month, so
+    back-to-back leases changing over mid-month clash too.
+    """
+    groups = {}
+    for lease in leases:
+        groups.setdefault((lease.landlord, lease.series), []).append(lease)
+    problems = []
+    for group in groups.values():
+        group.sort(key=_start_order)
+        latest = group[0]
+        for lease in group[1:]:
+            if latest.end is None or _month(latest.end) >= _month(lease.start):
+                problems.append(f"lease {lease.id}: shares a billing month with lease {latest.id} of {lease.landlord} "
+                                f"with the same series {lease.series!r} (invoice numbers would repeat)")
+            if latest.end is not None and (lease.end is None or lease.end > latest.end):
+                latest = lease
+    return problems
@@ -0,0 +1,236 @@
+import datetime
+import hashlib
+import sqlite3
+from dataclasses import dataclass, fields
+
+from rentbill.core import invoice_amounts
+from rentbill.periods import period_index
+
+# -----------------------------------
+# INVOICE LEDGER (SQLite)
+# -----------------------------------
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS invoices (
+    id           INTEGER PRIMARY KEY,
+    landlord     TEXT    NOT NULL,
+    fy           TEXT    NOT NULL,
+    seq          INTEGER NOT NULL,
+    invoice_no   TEXT    NOT NULL,
+    invoice_date TEXT    NOT NULL,
+    period_from  TEXT    NOT NULL,
+    period_to    TEXT    NOT NULL,
+    rent         REAL    NOT NULL,
+    sgst         REAL    NOT NULL,
+    cgst         REAL    NOT NULL,
+    total        REAL    NOT NULL,
+    pdf_sha256   TEXT,
+    issued_at    TEXT    NOT NULL,
+    recipient_gstin TEXT NOT NULL DEFAULT '',
+    place_of_supply TEXT NOT NULL DEFAULT '',
+    lease_id     TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_invoices_landlord_fy_seq ON invoices (landlord, fy, seq);
+CREATE INDEX IF NOT EXISTS ix_invoices_invoice_no ON invoices (invoice_no);
+CREATE INDEX IF NOT EXISTS ix_invoices_fy ON invoices (fy);
+"""
+
+# Columns added after the first release; ledgers created before them get them on open
+ADDED_COLUMNS = {
+    "recipient_gstin": "TEXT NOT NULL DEFAULT ''",
+    "place_of_supply": "TEXT NOT NULL DEFAULT ''",
+    "lease_id": "TEXT",
+}
+
+
+@dataclass
+class LedgerEntry:
+    landlord: str
+    fy: str
+    seq: int
+    invoice_no: str
+    invoice_date: datetime.date
+    period_from: datetime.date
+    period_to: datetime.date
+    rent: float
+    sgst: float
+    cgst: float
+    total: float
+    pdf_sha256: str | None = None
+    issued_at: datetime.datetime | None = None
+    recipient_gstin: str = ""
+    place_of_supply: str = ""  # "33-Tamil Nadu": state of the rented property
+    lease_id: str | None = None
+    id: int | None = None
+
+
+_COLUMNS = [f.name for f in fields(LedgerEntry) if f.name != "id"]
+_DATE_COLUMNS = ("invoice_date", "period_from", "period_to")
+
+
+def _from_row(row: sqlite3.Row) -> LedgerEntry:
+    d = dict(row)
+    for k in _DATE_COLUMNS:
+        d[k] = datetime.date.fromisoformat(d[k])
+    d["issued_at"] = datetime.datetime.fromisoformat(d["issued_at"])
+    return LedgerEntry(**d)
+
+
+def make_entry(
+    landlord: str,
+    invoice_no: str,
+    invoice_date: datetime.date,
+    from_date: datetime.date,
+    to_date: datetime.date,
+    rent: float,
+    pdf: bytes | None = None,
+    recipient_gstin: str = "",
+    place_of_supply: str = "",
+    lease_id: str | None = None,
+) -> LedgerEntry:
+    period = period_index.for_date(invoice_date)
+    sgst, cgst, total, _ = invoice_amounts(rent)
+    return LedgerEntry(
+        landlord=landlord,
+        fy=period.fy,
+        seq=period.seq,
+        invoice_no=invoice_no,
+        invoice_date=invoice_date,
+        period_from=from_date,
+        period_to=to_date,
+        rent=rent,
+        sgst=sgst,
+        cgst=cgst,
+        total=total,
+        pdf_sha256=hashlib.sha256(pdf).hexdigest() if pdf is not None else None,
+        recipient_gstin=recipient_gstin,
+        place_of_supply=place_of_supply,
+        lease_id=lease_id,
+    )
+
+
+class InvoiceLedger:
+    def __init__(self, path: str = "invoices.sqlite"):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            have = {r["name"] for r in self.conn.execute("PRAGMA table_info(invoices)")}
+            for name, decl in ADDED_COLUMNS.items():
+                if name not in have:
+                    self.conn.execute(f"ALTER TABLE invoices ADD COLUMN {name} {decl}")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- writes ------------------------------------------------------------
+    def record_many(self, entries) -> int:
+        now = datetime.datetime.now().isoformat(timespec="seconds")
+        rows = []
+        for e in entries:
+            row = []
+            for k in _COLUMNS:
+                v = getattr(e, k)
+                if k == "issued_at":
+                    v = v.isoformat(timespec="seconds") if v else now
+                elif k in _DATE_COLUMNS:
+                    v = v.isoformat()
+                row.append(v)
+            rows.append(row)
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO invoices ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                rows,
+            )
+        return len(rows)
+
+    def record(self, entry: LedgerEntry) -> None:
+        self.record_many([entry])
+
+    # -- queries -----------------------------------------------------------
+    def _query(self, sql: str, params=()) -> list[LedgerEntry]:
+        return [_from_row(r) for r in self.conn.execute(sql, params)]
+
+    def invoices_for_fy(self, fy: str, landlord: str | None = None) -> list[LedgerEntry]:
+        if landlord is None:
+            return self._query("SELECT * FROM invoices WHERE fy = ? ORDER BY landlord, seq, id", (fy,))
+        return self._query(
+            "SELECT * FROM invoices WHERE landlord = ? AND fy = ? ORDER BY seq, id", (landlord, fy)
+        )
+
+    def iter_invoices(self, fy_from: str | None = None, fy_to: str | None = None, landlords=None,
+                      chunk_size: int = 1000):
+        """
+        Entries (optionally FY labels fy_from..fy_to inclusive, some landlords
+        only) in FY, month, landlord order, fetched `chunk_size` rows at a time
+        so a long history never sits in memory.
+        """
+        where, params = [], []
+        if fy_from is not None:
+            where.append("fy >= ?")
+            params.append(fy_from)
+        if fy_to is not None:
+            where.append("fy <= ?")
+            params.append(fy_to)
+        if landlords:
+            where.append(f"landlord IN ({', '.join('?' * len(landlords))})")
+            params.extend(landlords)
+        sql = "SELECT * FROM invoices"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        cursor = self.conn.execute(sql + " ORDER BY fy, seq, landlord, invoice_no, id", params)
+        try:
+            while rows := cursor.fetchmany(chunk_size):
+                for r in rows:
+                    yield _from_row(r)
+        finally:
+            cursor.close()
+
+    def by_invoice_no(self, invoice_no: str, landlord: str | None = None) -> list[LedgerEntry]:
+        if landlord is None:
+            return self._query("SELECT * FROM invoices WHERE invoice_no = ? ORDER BY landlord, id", (invoice_no,))
+        return self._query(
+            "SELECT * FROM invoices WHERE invoice_no = ? AND landlord = ? ORDER BY id", (invoice_no, landlord)
+        )
+
+    def last_invoice_per_landlord(self) -> dict[str, LedgerEntry]:
+        rows = self._query(
+            """
+            SELECT i.* FROM invoices i
+            JOIN (SELECT landlord, MAX(fy) AS fy FROM invoices GROUP BY landlord) f
+              ON f.landlord = i.landlord AND f.fy = i.fy
+            WHERE i.seq = (SELECT MAX(seq) FROM invoices x WHERE x.landlord = i.landlord AND x.fy = i.fy)
+            ORDER BY i.landlord, i.id
+            """
+        )
+        # Re-issues share (landlord, fy, seq); the latest recorded one wins
+        return {e.landlord: e for e in rows}
+
+    def is_duplicate(self, landlord: str, invoice_no: str) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM invoices WHERE invoice_no = ? AND landlord = ? LIMIT 1", (invoice_no, landlord)
+        ).fetchone()
+        return row is not None
+
+    def find_duplicates(self) -> list[list[LedgerEntry]]:
+        """Groups of entries issued more than once for the same landlord and invoice number."""
+        rows = self._query(
+            """
+            SELECT i.* FROM invoices i
+            JOIN (
+                SELECT landlord, invoice_no FROM invoices
+                GROUP BY landlord, invoice_no HAVING COUNT(*) > 1
+            ) d ON d.landlord = i.landlord AND d.invoice_no = i.invoice_no
+            ORDER BY i.landlord, i.invoice_no, i.id
+            """
+        )
+        groups = {}
+        for e in rows:
+            groups.setdefault((e.landlord, e.invoice_no), []).append(e)
+        return list(groups.values())
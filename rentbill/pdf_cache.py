@@ -0,0 +1,160 @@
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import astuple
+
+from rentbill import core
+from rentbill.core import make_invoice_pdf, registry_fingerprint
+from rentbill.preview import preview_template
+
+# -----------------------------------
+# CONTENT-ADDRESSED PDF CACHE
+# -----------------------------------
+def invoice_key(person, invoice_no, invoice_date, from_date, to_date, rent, sgst, cgst, total, amount_words, theme,
+                items=None, recipient=None, options=None) -> str:
+    parts = (
+        astuple(person),
+        sorted((recipient or core.RECIPIENT).items()),
+        invoice_no,
+        invoice_date.isoformat(),
+        from_date.isoformat(),
+        to_date.isoformat(),
+        repr(float(rent)),
+        repr(float(sgst)),
+        repr(float(cgst)),
+        repr(float(total)),
+        amount_words,
+        tuple(sorted(theme.items())),
+        tuple((i.description, repr(float(i.amount))) for i in items) if items else None,
+        options or core.PDF_OPTIONS,
+    )
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+
+def _size(data) -> int:
+    """Bytes an entry counts for: PDFs as they are, preview HTML as UTF-8."""
+    return len(data.encode("utf-8")) if isinstance(data, str) else len(data)
+
+
+class PdfCache:
+    """
+    Thread-safe LRU of rendered PDFs (or preview HTML), bounded by entry
+    count and total size in bytes, with an optional per-entry TTL in seconds.
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 32 * 1024 * 1024, ttl: float | None = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (data, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[1] is not None and item[1] <= time.monotonic():
+                del self._data[key]
+                self._bytes -= item[2]
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: str, data) -> None:
+        size = _size(data)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._data[key] = (data, expires_at, size)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def get_or_render(self, key: str, render) -> bytes:
+        data = self.get(key)
+        if data is None:
+            data = render()
+            self.put(key, data)
+        return data
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+# Process-wide: survives Streamlit reruns and is shared by every session,
+# because modules are imported once per server process
+default_cache = PdfCache(ttl=6 * 3600)
+preview_cache = PdfCache(max_entries=512, max_bytes=16 * 1024 * 1024, ttl=6 * 3600)
+
+_registry_lock = threading.Lock()
+_registry_seen = None
+
+
+def invalidate_all() -> None:
+    for cache in (default_cache, preview_cache):
+        cache.clear()
+    template = sys.modules.get("rentbill.template")  # only loaded once something has been drawn
+    if template is not None:
+        template.clear_templates()
+
+
+def invalidate_on_registry_change() -> bool:
+    """
+    Clear the shared caches if PEOPLE / RECIPIENT / THEMES changed since the
+    last call. Keys already cover the person, recipient and theme; this
+    drops entries a reload has made unreachable.
+    """
+    global _registry_seen
+    fp = registry_fingerprint()
+    with _registry_lock:
+        if fp == _registry_seen:
+            return False
+        changed = _registry_seen is not None
+        _registry_seen = fp
+    if changed:
+        invalidate_all()
+    return changed
+
+
+def cached_invoice_pdf(cache: PdfCache | None = None, **kwargs) -> bytes:
+    """make_invoice_pdf(**kwargs), served from `cache` when the inputs were seen before."""
+    if cache is None:
+        cache = default_cache
+    return cache.get_or_render(invoice_key(**kwargs), lambda: make_invoice_pdf(**kwargs))
+
+
+def cached_preview_template(person, recipient=None) -> tuple[str, str]:
+    """(template_key, template) for the incremental preview; the key changes whenever the markup does."""
+    recipient = recipient or core.RECIPIENT
+    key = hashlib.sha256(repr(("preview_template", astuple(person), sorted(recipient.items()))).encode("utf-8")).hexdigest()
+    template = preview_cache.get_or_render(key, lambda: preview_template(person, recipient))
+    return hashlib.sha1(template.encode("utf-8")).hexdigest()[:16], template
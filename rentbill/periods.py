@@ -0,0 +1,105 @@
+import datetime
+import re
+from dataclasses import dataclass
+
+from rentbill.core import fy_label, fy_months, fy_starts, invoice_seq_and_fy, month_period
+
+# -----------------------------------
+# PERIOD INDEX
+# -----------------------------------
+INVOICE_NO_RE = re.compile(r"^\s*(\d{1,2})\s*/\s*(\d{4})\s*-\s*(\d{2})\s*$")
+
+
+@dataclass(frozen=True)
+class Period:
+    fy_start: int
+    fy: str
+    seq: int
+    month: int
+    month_name: str
+    from_date: datetime.date
+    to_date: datetime.date
+    invoice_no: str
+
+    @property
+    def invoice_date(self) -> datetime.date:
+        return self.from_date
+
+
+def _make_period(fy_start: int, month_name: str, month_num: int) -> Period:
+    from_date, to_date = month_period(fy_start, month_num)
+    seq, fy = invoice_seq_and_fy(from_date)
+    return Period(
+        fy_start=fy_start,
+        fy=fy,
+        seq=seq,
+        month=month_num,
+        month_name=month_name,
+        from_date=from_date,
+        to_date=to_date,
+        invoice_no=f"{seq:02d} / {fy}",
+    )
+
+
+class PeriodIndex:
+    """
+    Every FY month in `fy_range`, built once. Lookups by date, by
+    (fy_start, month) and by invoice number are dict hits; dates or numbers
+    outside the range are computed on the fly with the same rules.
+    """
+
+    def __init__(self, fy_range=None):
+        self.fy_range = tuple(fy_range or fy_starts)
+        self.month_names = [name for name, _ in fy_months]
+        self.month_num = dict(fy_months)
+        self.month_name = {num: name for name, num in fy_months}
+
+        self.periods = tuple(
+            _make_period(fy_start, name, num) for fy_start in self.fy_range for name, num in fy_months
+        )
+        self._by_month = {(p.from_date.year, p.month): p for p in self.periods}
+        self._by_fy_month = {(p.fy_start, p.month): p for p in self.periods}
+        self._by_invoice_no = {p.invoice_no: p for p in self.periods}
+
+    def __len__(self) -> int:
+        return len(self.periods)
+
+    def __iter__(self):
+        return iter(self.periods)
+
+    def fy(self, fy_start: int) -> tuple[Period, ...]:
+        """The 12 periods of one FY, April first."""
+        return tuple(self.month(fy_start, num) for _, num in fy_months)
+
+    def month(self, fy_start: int, month_num: int) -> Period:
+        p = self._by_fy_month.get((fy_start, month_num))
+        return p if p is not None else _make_period(fy_start, self.month_name[month_num], month_num)
+
+    def for_date(self, d: datetime.date) -> Period:
+        """The period (calendar month) containing `d`."""
+        p = self._by_month.get((d.year, d.month))
+        if p is None:
+            fy_start = d.year if d.month >= 4 else d.year - 1
+            p = _make_period(fy_start, self.month_name[d.month], d.month)
+        return p
+
+    def for_invoice_no(self, invoice_no: str) -> Period:
+        """
+        Reverse lookup: which period does "07 / 2027-28" cover? Spacing is
+        forgiving ("7/2027-28" works); raises ValueError for anything that is
+        not a sequence number and FY label.
+        """
+        p = self._by_invoice_no.get(invoice_no)
+        if p is not None:
+            return p
+        m = INVOICE_NO_RE.match(invoice_no or "")
+        if not m:
+            raise ValueError(f"Not an invoice number: {invoice_no!r}")
+        seq, fy_start, fy_end = int(m.group(1)), int(m.group(2)), m.group(3)
+        if not 1 <= seq <= 12 or fy_label(fy_start) != f"{fy_start}-{fy_end}":
+            raise ValueError(f"Not an invoice number: {invoice_no!r}")
+        month_num = seq + 3 if seq <= 9 else seq - 9
+        return self.month(fy_start, month_num)
+
+
+period_index = PeriodIndex()
@@ -0,0 +1,217 @@
+import datetime
+import re
+from html import escape
+
+from rentbill.core import RECIPIENT, InvoiceLine, Person, format_money, normalize_text_for_display, rent_line
+
+# -----------------------------------
+# HTML PREVIEW (mirrors the PDF layout)
+# -----------------------------------
+# The preview is split into a static template (CSS + the landlord/recipient
+# markup, which only change with the person or the registry) and a few
+# fields. Fields live in elements marked data-f="<name>"; the Streamlit
+# preview component patches just those on each rerun, and
+# build_preview_html() fills them server-side for a standalone document.
+PREVIEW_CSS = """
+      body{ margin:0; padding:0; background:#fff; font-family: Arial, sans-serif; }
+      .preview-frame{ border:2px solid rgba(47,94,142,0.20); border-radius:16px; overflow:hidden; background:white; }
+      .inv-bar{ height:14px; background: linear-gradient(90deg, var(--accent), var(--accent2)); }
+      .inv-top{ padding:14px 18px; display:flex; justify-content:space-between; gap:18px; }
+      .inv-top-left{ font-size:12px; line-height:1.6; color:#333; }
+      .inv-top-right{ text-align:right; min-width:320px; }
+      .inv-title{ font-size:22px; font-weight:900; letter-spacing:0.8px; color:#42526b; }
+      .inv-note{ font-size:11px; color:#666; margin-top:4px; }
+      .inv-meta{ margin-top:10px; border:1px solid #d9d9d9; border-radius:10px; overflow:hidden; }
+      .inv-meta-row{ display:flex; justify-content:space-between; padding:10px 12px; border-top:1px solid #e6e6e6; font-size:12px; background:#fbfdff; }
+      .inv-meta-row:first-child{ border-top:none; }
+      .inv-meta-row b{ color:#2a3b57; }
+      .inv-body{ padding:14px 18px 18px 18px; }
+      .section{ margin-top:12px; }
+      .section-title{ font-size:12px; font-weight:900; color:var(--accent3); margin-bottom:8px; }
+      .lines{ font-size:12px; line-height:1.6; color:#333; }
+      .hr{ height:1px; background:#ededed; margin:14px 0; }
+      .kv-grid{ display:grid; grid-template-columns: 240px 14px 1fr; row-gap:8px; font-size:12px; line-height:1.5; }
+      .kv-grid .c{ text-align:center; color:#666; }
+      .table{ margin-top:14px; border:1px solid #d9d9d9; border-radius:10px; overflow:hidden; }
+      .thead{ display:flex; justify-content:space-between; background: linear-gradient(90deg, var(--accent), var(--accent2)); color:white; font-weight:900; font-size:12px; }
+      .thead div{ padding:10px 12px; }
+      .trow{ display:flex; justify-content:space-between; gap:12px; border-top:1px solid #eee; font-size:12px; }
+      .trow:nth-child(odd){ background:#f7faff; }
+      .trow div{ padding:10px 12px; }
+      .wdesc{ flex:1 1 auto; }
+      .wamt{ width:180px; text-align:right; white-space:nowrap; }
+      .rightlabel{ text-align:right; padding-right:30px; font-weight:700; color:#2a3b57; }
+      .totalrow{ background:#eef5ff; font-weight:900; }
+      .amountwords{ margin-top:12px; font-size:12px; line-height:1.6; }
+      .signature{ margin-top:26px; display:flex; justify-content:flex-end; }
+      .sigbox{ width:300px; font-size:12px; line-height:1.8; }
+      .sigbox b{ color:#2a3b57; }
+"""
+
+FIELD_RE = re.compile(r'(<(\w+)[^>]*\sdata-f="(\w+)"[^>]*>)(</\2>)')
+
+
+def preview_template(person: Person, recipient: dict | None = None) -> str:
+    recipient = recipient or RECIPIENT
+    recipient_lines_preview = "<br>".join(normalize_text_for_display(x, for_html=True) for x in recipient["address_lines"])
+    address_preview = "<br>".join(
+        normalize_text_for_display(x, for_html=True) for x in person.address_lines
+    )
+
+    # if person.name == "S.N.Geetha":
+    #     address_preview = address_preview.replace(
+    #         "River View Housing Society",
+    #         "River&nbsp;View&nbsp;Housing&nbsp;Society"
+    #     )
+    #     address_preview = address_preview.replace(", Chennai", ",<br>Chennai")
+
+    return f"""
+    <style>{PREVIEW_CSS}</style>
+    <div class="preview-frame">
+      <div class="inv-bar"></div>
+
+      <div class="inv-top">
+        <div class="inv-top-left">
+          <div><b>Name: {escape(person.name)}</b></div>
+          <div>{address_preview}</div>
+        </div>
+
+        <div class="inv-top-right">
+          <div class="inv-title">TAX INVOICE</div>
+          <div class="inv-note">Original for Recipient</div>
+          <div class="inv-meta">
+            <div class="inv-meta-row"><b>Invoice No.</b><span data-f="invoice_no"></span></div>
+            <div class="inv-meta-row"><b>Date</b><span data-f="invoice_date"></span></div>
+          </div>
+        </div>
+      </div>
+
+      <div class="inv-body">
+        <div class="section">
+          <div class="section-title">Name & Address of service recipient</div>
+          <div class="lines"><b>{escape(recipient["name"])}</b><br>
+            {recipient_lines_preview}
+          </div>
+          <div class="lines" style="margin-top:10px;"><b>GSTIN of recipient :</b> <b>{escape(recipient["gstin"])}</b></div>
+        </div>
+
+        <div class="hr"></div>
+
+        <div class="section">
+          <div class="kv-grid">
+            <div><b>PAN Number of Service Provider</b></div><div class="c">:</div><div><b>{escape(person.pan)}</b></div>
+            <div><b>GST Registration Number of Service Provider</b></div><div class="c">:</div><div><b>{escape(person.gst)}</b></div>
+            <div><b>Service Accounting Code (SAC)</b></div><div class="c">:</div><div>{escape(person.sac)}</div>
+            <div><b>Description of Service Accounting Code (SAC)</b></div><div class="c">:</div><div>{escape(person.desc)}</div>
+            <div><b>Location of Service Provided</b></div><div class="c">:</div><div>{escape(person.location)}</div>
+            <div><b>State Code of Service Location</b></div><div class="c">:</div><div>{escape(person.state_code)}</div>
+            <div><b>State Name of Service Location</b></div><div class="c">:</div><div>{escape(person.state_name)}</div>
+          </div>
+        </div>
+
+        <div class="table" data-f="table" data-html="1"></div>
+
+        <div class="amountwords"><b>Amount in words:</b> <span data-f="amount_words"></span></div>
+
+        <div class="signature">
+          <div class="sigbox">
+            <div><b>Signature:</b></div>
+            <div style="margin-top:18px;"><b>Name :</b> Name</div>
+            <div><b>Authorised Signatory</b></div>
+          </div>
+        </div>
+      </div>
+
+      <div class="inv-bar"></div>
+    </div>
+    """
+
+
+def preview_fields(
+    invoice_no: str,
+    invoice_date: datetime.date,
+    from_date: datetime.date,
+    to_date: datetime.date,
+    rent: float,
+    sgst: float,
+    cgst: float,
+    total: float,
+    amount_words: str,
+    theme: dict,
+    items: tuple[InvoiceLine, ...] | None = None
+) -> dict:
+    """Everything in the preview that changes while typing. "table" is HTML; the rest is plain text."""
+    item_rows = "".join(
+        f"""
+          <div class="trow">
+            <div class="wdesc">{escape(item.description)}</div>
+            <div class="wamt">{format_money(item.amount)}</div>
+          </div>"""
+        for item in (items or (rent_line(from_date, to_date, rent),))
+    )
+    table = f"""
+          <div class="thead"><div>Particulars</div><div>Amt Rs</div></div>
+{item_rows}
+          <div class="trow">
+            <div class="wdesc rightlabel">SGST @ 9%</div>
+            <div class="wamt">{format_money(sgst)}</div>
+          </div>
+          <div class="trow">
+            <div class="wdesc rightlabel">CGST @ 9%</div>
+            <div class="wamt">{format_money(cgst)}</div>
+          </div>
+          <div class="trow totalrow">
+            <div class="wdesc">Total</div>
+            <div class="wamt">{format_money(total)}</div>
+          </div>
+        """
+    return {
+        "invoice_no": invoice_no,
+        "invoice_date": invoice_date.strftime("%d/%m/%Y"),
+        "amount_words": amount_words,
+        "table": table,
+        "vars": {
+            "--accent": theme["primary"],
+            "--accent2": theme["secondary"],
+            "--accent3": theme["accent_dark"],
+        },
+    }
+
+
+def fill_template(template: str, fields: dict) -> str:
+    def fill(m):
+        value = fields.get(m.group(3))
+        if value is None:
+            return m.group(0)
+        return m.group(1) + (value if 'data-html="1"' in m.group(1) else escape(value)) + m.group(4)
+    return FIELD_RE.sub(fill, template)
+
+
+def build_preview_html(
+    person: Person,
+    invoice_no: str,
+    invoice_date: datetime.date,
+    from_date: datetime.date,
+    to_date: datetime.date,
+    rent: float,
+    sgst: float,
+    cgst: float,
+    total: float,
+    amount_words: str,
+    theme: dict,
+    items: tuple[InvoiceLine, ...] | None = None,
+    recipient: dict | None = None
+) -> str:
+    """The whole preview as one standalone HTML document."""
+    fields = preview_fields(invoice_no, invoice_date, from_date, to_date, rent, sgst, cgst, total, amount_words,
+                            theme, items)
+    theme_vars = "".join(f"{k}:{v};" for k, v in fields["vars"].items())
+    return f"""
+    <!doctype html>
+    <html>
+    <head><style>:root{{{theme_vars}}}</style></head>
+    <body>
+    {fill_template(preview_template(person, recipient), fields)}
+    </body>
+    </html>
+    """
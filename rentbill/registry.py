@@ -0,0 +1,627 @@
+import datetime
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import astuple, fields
+
+from rentbill.core import PEOPLE, RECIPIENT, THEMES, Person
+from rentbill.leases import Lease, LeaseIndex, Property, lease_person, series_clashes
+
+# -----------------------------------
+# VALIDATION
+# -----------------------------------
+# 4th PAN letter is the holder type (P individual, C company, H HUF, F firm...)
+PAN_RE = re.compile(r"^[A-Z]{3}[ABCFGHJLPT][A-Z]\d{4}[A-Z]$")
+# state code + PAN + entity number + "Z" + check character
+GSTIN_RE = re.compile(r"^(\d{2})([A-Z]{3}[ABCFGHJLPT][A-Z]\d{4}[A-Z])[1-9A-Z]Z[0-9A-Z]$")
+SAC_RE = re.compile(r"^99\d{4}$")
+STATE_CODE_RE = re.compile(r"^\d{2}$")
+COLOR_RE = re.compile(r"^#[0-9A-Fa-f]{6}$")
+THEME_KEYS = ("primary", "secondary", "accent_dark", "light_bg", "ui_bg")
+PERSON_FIELDS = tuple(f.name for f in fields(Person))
+RECIPIENT_FIELDS = ("name", "address_lines", "gstin")
+PROPERTY_FIELDS = tuple(f.name for f in fields(Property))
+LEASE_FIELDS = tuple(f.name for f in fields(Lease))
+
+_GSTIN_CHARS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+class RegistryError(ValueError):
+    """A registry that failed to load or validate; `problems` lists everything found, not just the first."""
+
+    def __init__(self, source: str, problems):
+        self.source = source
+        self.problems = list(problems)
+        super().__init__(f"{source}: " + "; ".join(self.problems))
+
+
+def gstin_check_char(gstin: str) -> str:
+    """The 15th GSTIN character: base-36 Luhn over the first 14."""
+    total = 0
+    for i, ch in enumerate(gstin[:14]):
+        v = _GSTIN_CHARS.index(ch) * (2 if i % 2 else 1)
+        total += v // 36 + v % 36
+    return _GSTIN_CHARS[-total % 36]
+
+
+def gstin_problems(gstin: str, pan: str | None = None) -> list[str]:
+    m = GSTIN_RE.match(gstin or "")
+    if not m:
+        return [f"GSTIN {gstin!r} is not a 15-character GSTIN"]
+    problems = []
+    if gstin[-1] != gstin_check_char(gstin):
+        problems.append(f"GSTIN {gstin} has a bad check character")
+    if pan is not None and m.group(2) != pan:
+        problems.append(f"GSTIN {gstin} does not contain PAN {pan}")
+    return problems
+
+
+def person_problems(p: Person) -> list[str]:
+    problems = []
+    if not p.name:
+        problems.append("name is empty")
+    if not p.address_lines:
+        problems.append("address_lines is empty")
+    if not PAN_RE.match(p.pan):
+        problems.append(f"PAN {p.pan!r} is not in AAAAA9999A format")
+    problems += gstin_problems(p.gst, p.pan)
+    if not SAC_RE.match(p.sac):
+        problems.append(f"SAC {p.sac!r} is not a 6-digit services code")
+    if not (p.default_rent >= 0):
+        problems.append(f"default_rent {p.default_rent!r} is negative")
+    return [f"{p.name or '<unnamed>'}: {x}" for x in problems]
+
+
+def lease_problems(lease: Lease) -> list[str]:
+    problems = []
+    if not (lease.rent >= 0):
+        problems.append(f"rent {lease.rent!r} is negative")
+    if lease.end is not None and lease.end < lease.start:
+        problems.append(f"ends ({lease.end}) before it starts ({lease.start})")
+    return [f"lease {lease.id}: {x}" for x in problems]
+
+
+def theme_problems(name: str, theme: dict) -> list[str]:
+    return [
+        f"theme {name}: {k} {theme.get(k)!r} is not a #RRGGBB colour"
+        for k in THEME_KEYS if not COLOR_RE.match(str(theme.get(k, "")))
+    ]
+
+
+# -----------------------------------
+# REGISTRY SNAPSHOT
+# -----------------------------------
+def default_leases(people, recipient: dict) -> tuple[list[Property], list[Lease]]:
+    """The single-tenant setup as a lease book: each landlord lets its own location to `recipient`, open-ended."""
+    properties, leases = [], []
+    for p in people:
+        properties.append(Property(id=p.name, location=p.location, state_code=p.state_code, state_name=p.state_name))
+        leases.append(Lease(id=p.name, landlord=p.name, property_id=p.name, tenant=recipient["name"],
+                            rent=p.default_rent, start=datetime.date.min))
+    return properties, leases
+
+
+class Registry:
+    """
+    One validated snapshot of landlords, recipients, themes, properties and
+    leases. Landlords are indexed by name, GSTIN and PAN (one PAN may hold
+    several GSTINs, one per state, so `by_pan` maps to a tuple); leases by
+    landlord, tenant, property and period (see LeaseIndex). Without a lease
+    book, each landlord gets one open-ended lease of its own location to the
+    default recipient. Snapshots are not modified after construction; a
+    reload builds a new one.
+    """
+
+    def __init__(self, people, recipients, themes: dict, source: str = "<builtin>", properties=None, leases=None):
+        self.source = source
+        self._fingerprint = None
+        problems = []
+
+        self.people = {}
+        self.by_gstin = {}
+        by_pan = {}
+        for p in people:
+            problems += person_problems(p)
+            if p.name in self.people:
+                problems.append(f"{p.name}: duplicate landlord name")
+            if p.gst in self.by_gstin:
+                problems.append(f"{p.name}: GSTIN {p.gst} already belongs to {self.by_gstin[p.gst].name}")
+            self.people[p.name] = p
+            self.by_gstin.setdefault(p.gst, p)
+            by_pan.setdefault(p.pan, []).append(p)
+        self.by_pan = {pan: tuple(ps) for pan, ps in by_pan.items()}
+
+        self.recipients = {}
+        self.recipient = None
+        for r in recipients:
+            r = dict(r)
+            is_default = bool(r.pop("default", False))
+            problems += [f"recipient {r['name']}: {x}" for x in gstin_problems(r["gstin"])]
+            if r["name"] in self.recipients:
+                problems.append(f"recipient {r['name']}: duplicate recipient name")
+            self.recipients[r["name"]] = r
+            if self.recipient is None or is_default:
+                self.recipient = r
+
+        self.themes = {}
+        for name, theme in themes.items():
+            problems += theme_problems(name, theme)
+            if name not in self.people:
+                problems.append(f"theme {name}: no landlord with that name")
+            self.themes[name] = {k: theme[k] for k in THEME_KEYS if k in theme}
+
+        if not self.people:
+            problems.append("no landlords")
+        if self.recipient is None:
+            problems.append("no recipients")
+            leases = leases or ()
+        if leases is None:
+            properties, leases = default_leases(self.people.values(), self.recipient)
+
+        self.properties = {}
+        for prop in properties or ():
+            if prop.id in self.properties:
+                problems.append(f"property {prop.id}: duplicate property id")
+            if not STATE_CODE_RE.match(prop.state_code):
+                problems.append(f"property {prop.id}: state code {prop.state_code!r} is not 2 digits")
+            self.properties[prop.id] = prop
+
+        leases = list(leases)
+        seen = set()
+        for lease in leases:
+            problems += lease_problems(lease)
+            if lease.id in seen:
+                problems.append(f"lease {lease.id}: duplicate lease id")
+            seen.add(lease.id)
+            for ref, known, what in ((lease.landlord, self.people, "landlord"),
+                                     (lease.property_id, self.properties, "property"),
+                                     (lease.tenant, self.recipients, "tenant")):
+                if ref not in known:
+                    problems.append(f"lease {lease.id}: unknown {what} {ref!r}")
+        problems += series_clashes(leases)
+
+        if problems:
+            raise RegistryError(source, problems)
+        self.lease_index = LeaseIndex(leases)
+
+    def __len__(self) -> int:
+        return len(self.people)
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash of the whole snapshot, computed once (cache invalidation compares it on every rerun)."""
+        if self._fingerprint is None:
+            data = (self.people, self.recipients, self.recipient, self.themes, self.properties,
+                    tuple(self.lease_index.leases.values()))
+            self._fingerprint = hashlib.sha256(repr(data).encode("utf-8")).hexdigest()
+        return self._fingerprint
+
+    def find(self, query: str) -> tuple[Person, ...]:
+        """Landlords whose name, GSTIN or PAN is `query` (GSTIN and PAN are case-insensitive)."""
+        query = (query or "").strip()
+        if query in self.people:
+            return (self.people[query],)
+        key = query.upper()
+        if key in self.by_gstin:
+            return (self.by_gstin[key],)
+        return self.by_pan.get(key, ())
+
+    def lease_parties(self, lease: Lease) -> tuple[Person, dict]:
+        """(landlord as printed on this lease's invoices, tenant) for make_invoice_pdf's person / recipient."""
+        return lease_person(self.people[lease.landlord], self.properties[lease.property_id]), self.recipients[lease.tenant]
+
+    def as_dict(self) -> dict:
+        """The JSON registry format (see load_registry)."""
+        return {
+            "landlords": [
+                {**dict(zip(PERSON_FIELDS, astuple(p))), "address_lines": list(p.address_lines)}
+                for p in self.people.values()
+            ],
+            "recipients": [
+                {**r, "address_lines": list(r["address_lines"]), "default": r is self.recipient}
+                for r in self.recipients.values()
+            ],
+            "themes": self.themes,
+            "properties": [dict(zip(PROPERTY_FIELDS, astuple(p))) for p in self.properties.values()],
+            "leases": [
+                {**dict(zip(LEASE_FIELDS, astuple(x))), "start": x.start.isoformat(),
+                 "end": x.end.isoformat() if x.end else None}
+                for x in self.lease_index.leases.values()
+            ],
+        }
+
+
+def _row_problem(what: str, row) -> str:
+    name = (row.get("name") or row.get("id")) if isinstance(row, dict) else None
+    return f"{what} {name or '<unnamed>'}"
+
+
+def _person(row: dict) -> Person:
+    missing = [k for k in PERSON_FIELDS if k not in row]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    lines = row["address_lines"]
+    if isinstance(lines, str):
+        raise ValueError("address_lines must be a list of lines")
+    return Person(
+        name=str(row["name"]).strip(),
+        address_lines=tuple(str(x) for x in lines),
+        pan=str(row["pan"]).strip().upper(),
+        gst=str(row["gst"]).strip().upper(),
+        sac=str(row["sac"]).strip(),
+        desc=str(row["desc"]),
+        location=str(row["location"]),
+        state_code=str(row["state_code"]).strip(),
+        state_name=str(row["state_name"]),
+        default_rent=float(row["default_rent"]),
+    )
+
+
+def _recipient(row: dict) -> dict:
+    missing = [k for k in RECIPIENT_FIELDS if k not in row]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    if isinstance(row["address_lines"], str):
+        raise ValueError("address_lines must be a list of lines")
+    return {
+        "name": str(row["name"]),
+        "address_lines": [str(x) for x in row["address_lines"]],
+        "gstin": str(row["gstin"]).strip().upper(),
+        "default": bool(row.get("default")),
+    }
+
+
+def _property(row: dict) -> Property:
+    missing = [k for k in PROPERTY_FIELDS if k not in row]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    return Property(**{k: str(row[k]).strip() for k in PROPERTY_FIELDS})
+
+
+def _lease(row: dict) -> Lease:
+    missing = [k for k in ("id", "landlord", "property_id", "tenant", "rent", "start") if k not in row]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    return Lease(
+        id=str(row["id"]).strip(),
+        landlord=str(row["landlord"]),
+        property_id=str(row["property_id"]).strip(),
+        tenant=str(row["tenant"]),
+        rent=float(row["rent"]),
+        start=datetime.date.fromisoformat(row["start"]),
+        end=datetime.date.fromisoformat(row["end"]) if row.get("end") else None,
+        series=str(row.get("series") or "").strip(),
+    )
+
+
+def registry_from_dict(data: dict, source: str = "<dict>") -> Registry:
+    """
+    {"landlords": [Person fields], "recipients": [{name, address_lines, gstin, default?}],
+    "themes": {landlord: theme}, "properties": [Property fields],
+    "leases": [Lease fields; dates ISO, end null = open-ended]}. Properties and leases are optional;
+    with neither, each landlord gets the default lease (see Registry).
+    """
+    if not isinstance(data, dict):
+        raise RegistryError(source, ["expected a JSON object"])
+    problems, people, recipients, properties, leases = [], [], [], [], []
+    for rows, parse, out, what in (
+        (data.get("landlords", []), _person, people, "landlord"),
+        (data.get("recipients", []), _recipient, recipients, "recipient"),
+        (data.get("properties") or [], _property, properties, "property"),
+        (data.get("leases") or [], _lease, leases, "lease"),
+    ):
+        for row in rows:
+            try:
+                out.append(parse(row))
+            except (ValueError, TypeError, AttributeError) as e:
+                problems.append(f"{_row_problem(what, row)}: {e}")
+    if problems:
+        raise RegistryError(source, problems)
+    return Registry(people, recipients, data.get("themes") or {}, source=source, properties=properties,
+                    leases=leases if "leases" in data or "properties" in data else None)
+
+
+# -----------------------------------
+# STORAGE (JSON / SQLite)
+# -----------------------------------
+SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS landlords (
+    name          TEXT PRIMARY KEY,
+    address_lines TEXT NOT NULL,  -- JSON list
+    pan           TEXT NOT NULL,
+    gst           TEXT NOT NULL,
+    sac           TEXT NOT NULL,
+    "desc"        TEXT NOT NULL,
+    location      TEXT NOT NULL,
+    state_code    TEXT NOT NULL,
+    state_name    TEXT NOT NULL,
+    default_rent  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_landlords_gst ON landlords (gst);
+CREATE INDEX IF NOT EXISTS ix_landlords_pan ON landlords (pan);
+CREATE TABLE IF NOT EXISTS recipients (
+    name          TEXT PRIMARY KEY,
+    address_lines TEXT NOT NULL,  -- JSON list
+    gstin         TEXT NOT NULL,
+    is_default    INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS themes (
+    landlord      TEXT PRIMARY KEY,
+    "primary"     TEXT NOT NULL,
+    secondary     TEXT NOT NULL,
+    accent_dark   TEXT NOT NULL,
+    light_bg      TEXT NOT NULL,
+    ui_bg         TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS properties (
+    id            TEXT PRIMARY KEY,
+    location      TEXT NOT NULL,
+    state_code    TEXT NOT NULL,
+    state_name    TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    id            TEXT PRIMARY KEY,
+    landlord      TEXT NOT NULL,
+    property_id   TEXT NOT NULL,
+    tenant        TEXT NOT NULL,
+    rent          REAL NOT NULL,
+    start         TEXT NOT NULL,
+    "end"         TEXT,           -- NULL = open-ended
+    series        TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS ix_leases_landlord ON leases (landlord);
+CREATE INDEX IF NOT EXISTS ix_leases_tenant ON leases (tenant);
+CREATE INDEX IF NOT EXISTS ix_leases_property ON leases (property_id);
+"""
+
+
+def _columns(names) -> str:
+    return ", ".join(f'"{k}"' for k in names)  # "desc", "primary" and "end" are SQL keywords
+
+
+def _is_sqlite(path: str) -> bool:
+    return path.lower().endswith(SQLITE_SUFFIXES)
+
+
+def _load_sqlite(path: str) -> dict:
+    import sqlite3
+
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        landlords = [
+            {**dict(r), "address_lines": json.loads(r["address_lines"])}
+            for r in conn.execute("SELECT * FROM landlords ORDER BY rowid")
+        ]
+        recipients = [
+            {"name": r["name"], "address_lines": json.loads(r["address_lines"]), "gstin": r["gstin"],
+             "default": bool(r["is_default"])}
+            for r in conn.execute("SELECT * FROM recipients ORDER BY rowid")
+        ]
+        themes = {r["landlord"]: {k: r[k] for k in THEME_KEYS} for r in conn.execute("SELECT * FROM themes")}
+        data = {"landlords": landlords, "recipients": recipients, "themes": themes}
+        tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if "leases" in tables:  # files written before leases existed have none
+            data["properties"] = [dict(r) for r in conn.execute("SELECT * FROM properties ORDER BY rowid")]
+            data["leases"] = [dict(r) for r in conn.execute("SELECT * FROM leases ORDER BY rowid")]
+    except sqlite3.Error as e:
+        raise RegistryError(path, [str(e)]) from e
+    finally:
+        conn.close()
+    return data
+
+
+def load_registry(path: str) -> Registry:
+    """Load and validate a registry from a .json file or a SQLite database (.sqlite / .sqlite3 / .db)."""
+    if _is_sqlite(path):
+        data = _load_sqlite(path)
+    else:
+        with open(path, encoding="utf-8") as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                raise RegistryError(path, [f"invalid JSON: {e}"]) from e
+    return registry_from_dict(data, source=path)
+
+
+def save_registry(registry: Registry, path: str) -> None:
+    """Write `registry` as JSON or SQLite (by suffix), replacing what was there."""
+    data = registry.as_dict()
+    if not _is_sqlite(path):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        os.replace(tmp, path)  # readers never see a half-written file
+        return
+
+    import sqlite3
+
+    conn = sqlite3.connect(path)
+    try:
+        with conn:
+            conn.executescript(SCHEMA)
+            conn.execute("DELETE FROM landlords")
+            conn.execute("DELETE FROM recipients")
+            conn.execute("DELETE FROM themes")
+            conn.execute("DELETE FROM properties")
+            conn.execute("DELETE FROM leases")
+            conn.executemany(
+                f"INSERT INTO landlords ({_columns(PERSON_FIELDS)}) "
+                f"VALUES ({', '.join('?' * len(PERSON_FIELDS))})",
+                [[json.dumps(row[k]) if k == "address_lines" else row[k] for k in PERSON_FIELDS]
+                 for row in data["landlords"]],
+            )
+            conn.executemany(
+                "INSERT INTO recipients (name, address_lines, gstin, is_default) VALUES (?, ?, ?, ?)",
+                [(r["name"], json.dumps(r["address_lines"]), r["gstin"], int(r["default"])) for r in data["recipients"]],
+            )
+            conn.executemany(
+                f"INSERT INTO themes (landlord, {_columns(THEME_KEYS)}) "
+                f"VALUES (?, {', '.join('?' * len(THEME_KEYS))})",
+                [(name, *(t[k] for k in THEME_KEYS)) for name, t in data["themes"].items()],
+            )
+            for table, names in (("properties", PROPERTY_FIELDS), ("leases", LEASE_FIELDS)):
+                conn.executemany(
+                    f"INSERT INTO {table} ({_columns(names)}) VALUES ({', '.join('?' * len(names))})",
+                    [[row[k] for k in names] for row in data[table]],
+                )
+    finally:
+        conn.close()
+
+
+# -----------------------------------
+# HOT RELOAD
+# -----------------------------------
+class RegistryStore:
+    """
+    A registry file that reloads itself when it changes on disk. The file's
+    mtime and size (plus the SQLite -wal file's) are checked at most every
+    `check_interval` seconds. A reload that fails keeps the previous
+    snapshot and sets `error`, so a half-saved edit never takes the app down.
+    """
+
+    def __init__(self, path: str, check_interval: float = 2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._signature = self._stat()
+        self.registry = load_registry(path)
+        self._checked = time.monotonic()
+        self.error = None
+        self.reloads = 0
+
+    def _stat(self):
+        signature = []
+        for p in (self.path, self.path + "-wal"):
+            try:
+                st = os.stat(p)
+            except FileNotFoundError:
+                signature.append(None)
+            else:
+                signature.append((st.st_mtime_ns, st.st_size))
+        return tuple(signature)
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload if the file changed; True when a new snapshot replaced the old one."""
+        now = time.monotonic()
+        if not force and now - self._checked < self.check_interval:
+            return False
+        with self._lock:
+            self._checked = now
+            signature = self._stat()
+            if signature == self._signature:
+                return False
+            self._signature = signature
+            try:
+                registry = load_registry(self.path)
+            except (OSError, ValueError) as e:
+                self.error = e
+                return False
+            self.registry = registry
+            self.error = None
+            self.reloads += 1
+            return True
+
+
+# -----------------------------------
+# ACTIVE REGISTRY
+# -----------------------------------
+# PEOPLE / RECIPIENT / THEMES in rentbill.core stay the objects everything
+# imports; installing a snapshot updates them in place (new keys are added
+# before removed ones are dropped, so readers never see an empty dict).
+REGISTRY_ENV = "RENTBILL_REGISTRY"
+
+_install_lock = threading.Lock()
+_store = None
+_active = Registry(PEOPLE.values(), [RECIPIENT], THEMES)
+
+
+def _install(registry: Registry) -> None:
+    global _active
+    for target, source in ((PEOPLE, registry.people), (THEMES, registry.themes)):
+        target.update(source)
+        for name in [k for k in target if k not in source]:
+            del target[name]
+    RECIPIENT.update(registry.recipient)
+    _active = registry
+
+
+def current() -> Registry:
+    return _active
+
+
+def use_registry(path: str, check_interval: float = 2.0) -> Registry:
+    """Serve landlords, recipients and themes from `path` from now on (and reload it when it changes)."""
+    global _store
+    store = RegistryStore(path, check_interval)
+    with _install_lock:
+        _store = store
+        _install(store.registry)
+    os.environ[REGISTRY_ENV] = path  # pool workers load the same file
+    return store.registry
+
+
+def refresh(force: bool = False) -> bool:
+    """Pick up registry file changes; cheap enough to call on every request or rerun."""
+    store = _store
+    if store is None or not store.refresh(force):
+        return False
+    with _install_lock:
+        _install(store.registry)
+    return True
+
+
+def last_error() -> Exception | None:
+    """Why the latest reload was rejected (the previous snapshot is still in use), else None."""
+    return _store.error if _store is not None else None
+
+
+def load_from_env() -> None:
+    path = os.environ.get(REGISTRY_ENV)
+    if path and _store is None:
+        use_registry(path)
+
+
+# -----------------------------------
+# CLI
+# -----------------------------------
+def add_arguments(parser):
+    parser.add_argument("action", choices=["check", "export", "find"],
+                        help="check: validate PATH; export: write the current registry to PATH; "
+                             "find: look up QUERY (name, GSTIN or PAN) in PATH")
+    parser.add_argument("path", help="Registry file (.json, or .sqlite / .sqlite3 / .db)")
+    parser.add_argument("query", nargs="?", help="find: landlord name, GSTIN or PAN")
+
+
+def run(args) -> int:
+    if args.action == "export":
+        save_registry(current(), args.path)
+        print(f"Wrote {len(current())} landlords ({current().source}) to {args.path}")
+        return 0
+
+    try:
+        registry = load_registry(args.path)
+    except RegistryError as e:
+        print(f"{e.source}: {len(e.problems)} problem(s)")
+        for problem in e.problems:
+            print(f"  - {problem}")
+        return 1
+
+    if args.action == "check":
+        print(f"{args.path}: {len(registry)} landlords, {len(registry.recipients)} recipients, "
+              f"{len(registry.themes)} themes, {len(registry.properties)} properties, "
+              f"{len(registry.lease_index)} leases")
+        return 0
+
+    matches = registry.find(args.query)
+    for p in matches:
+        print(f"{p.name}\t{p.pan}\t{p.gst}\t{p.location}")
+    return 0 if matches else 1
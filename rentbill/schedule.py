@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+from rentbill.batch import InvoiceJob, load_rent_overrides
+from rentbill.core import PEOPLE, fy_months, fy_starts
+from rentbill.words import amounts_to_words
+
+# -----------------------------------
+# VECTORIZED RENT / GST SCHEDULE
+# -----------------------------------
+def round2(values) -> np.ndarray:
+    """
+    Elementwise round(x, 2), bit-identical to Python's round().
+
+    np.round rounds x*100 in binary, which can disagree with Python's
+    correctly-rounded round() only when x*100 lies within float error of a
+    .5 boundary; those few values are redone with round().
+    """
+    values = np.asarray(values, dtype=float)
+    out = np.round(values, 2)
+    scaled = values * 100
+    tol = np.maximum(1e-7, np.abs(scaled) * 1e-15)
+    suspect = np.abs(scaled - np.floor(scaled) - 0.5) <= tol
+    if suspect.any():
+        out[suspect] = [round(float(v), 2) for v in values[suspect]]
+    return out
+
+
+def month_grid(person_keys=None, fy_range=None) -> pd.DataFrame:
+    """Full-month periods: one row per FY month per landlord, in FY then PEOPLE order."""
+    person_keys = list(person_keys or PEOPLE.keys())
+    fy_range = np.asarray(list(fy_range or fy_starts))
+    month_nums = np.array([m for _, m in fy_months])
+
+    fy_col = np.repeat(fy_range, len(month_nums) * len(person_keys))
+    month_col = np.tile(np.repeat(month_nums, len(person_keys)), len(fy_range))
+    year_col = np.where(month_col >= 4, fy_col, fy_col + 1)
+
+    from_date = pd.to_datetime({"year": year_col, "month": month_col, "day": 1})
+    return pd.DataFrame({
+        "landlord": np.tile(person_keys, len(fy_range) * len(month_nums)),
+        "from_date": from_date,
+        "to_date": from_date + pd.offsets.MonthEnd(0),
+    })
+
+
+def _base_rent(landlord: pd.Series, from_date: pd.Series, rent_overrides: dict | None) -> pd.Series:
+    rent = landlord.map({k: float(p.default_rent) for k, p in PEOPLE.items()}).astype(float)
+    if rent_overrides:
+        all_months = {name: r for (name, period), r in rent_overrides.items() if period is None}
+        per_month = {f"{name}|{period}": r for (name, period), r in rent_overrides.items() if period is not None}
+        rent = landlord.map(all_months).astype(float).fillna(rent)
+        key = landlord + "|" + from_date.dt.strftime("%Y-%m")
+        rent = key.map(per_month).astype(float).fillna(rent)
+    return rent
+
+
+def add_amounts(df: pd.DataFrame) -> pd.DataFrame:
+    """SGST, CGST, total and amount_words from df["rent"], matching invoice_amounts()."""
+    rent = df["rent"].to_numpy(dtype=float)
+    sgst = round2(rent * 0.09)
+    cgst = round2(rent * 0.09)
+    total = round2(rent + sgst + cgst)
+
+    df["sgst"] = sgst
+    df["cgst"] = cgst
+    df["total"] = total
+    df["amount_words"] = amounts_to_words(total)
+    return df
+
+
+def build_schedule(
+    person_keys=None,
+    fy_range=None,
+    rent_overrides: dict | None = None,
+    periods: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    """
+    Rent, pro-rata, SGST, CGST, totals and invoice numbers for many landlord
+    periods at once. `periods` (landlord, from_date, to_date; each within one
+    calendar month) defaults to every full FY month for every landlord; an
+    optional `base_rent` column there overrides the monthly rent per row
+    (NaN = default). Amounts match invoice_amounts() exactly.
+    """
+    if periods is None:
+        df = month_grid(person_keys, fy_range)
+    else:
+        cols = ["landlord", "from_date", "to_date"] + (["base_rent"] if "base_rent" in periods else [])
+        df = periods.loc[:, cols].copy()
+    df["from_date"] = pd.to_datetime(df["from_date"])
+    df["to_date"] = pd.to_datetime(df["to_date"])
+    df = df.reset_index(drop=True)
+
+    same_month = (df["from_date"].dt.year == df["to_date"].dt.year) & (df["from_date"].dt.month == df["to_date"].dt.month)
+    if not (same_month & (df["to_date"] >= df["from_date"])).all():
+        raise ValueError("Each period must run forwards within a single calendar month")
+
+    month = df["from_date"].dt.month.to_numpy()
+    year = df["from_date"].dt.year.to_numpy()
+    fy_start = np.where(month >= 4, year, year - 1)
+    seq = np.where(month >= 4, month - 3, month + 9)
+    df["fy"] = pd.Series(fy_start).astype(str) + "-" + pd.Series((fy_start + 1) % 100).astype(str).str.zfill(2)
+    df["seq"] = seq
+    df["invoice_no"] = df["seq"].astype(str).str.zfill(2) + " / " + df["fy"]
+    df["invoice_date"] = df["from_date"] - pd.to_timedelta(df["from_date"].dt.day - 1, unit="D")
+
+    df["days"] = (df["to_date"] - df["from_date"]).dt.days + 1
+    df["month_days"] = df["from_date"].dt.days_in_month
+    default_rent = _base_rent(df["landlord"], df["from_date"], rent_overrides)
+    df["base_rent"] = df["base_rent"].astype(float).fillna(default_rent) if "base_rent" in df else default_rent
+
+    base = df["base_rent"].to_numpy()
+    full = (df["days"] == df["month_days"]).to_numpy()
+    rent = np.where(full, base, round2(base * df["days"].to_numpy() / df["month_days"].to_numpy()))
+
+    df["rent"] = rent
+    return add_amounts(df)
+
+
+def to_jobs(df: pd.DataFrame) -> list[InvoiceJob]:
+    return [
+        InvoiceJob(
+            person_key=row.landlord,
+            invoice_no=row.invoice_no,
+            invoice_date=row.invoice_date.date(),
+            from_date=row.from_date.date(),
+            to_date=row.to_date.date(),
+            rent=float(row.rent),
+        )
+        for row in df.itertuples(index=False)
+    ]
+
+
+# -----------------------------------
+# CLI
+# -----------------------------------
+def add_arguments(parser):
+    parser.add_argument("out", help="Output CSV")
+    parser.add_argument("--fy-from", type=int, default=fy_starts[0], help="First FY start year (default: %(default)s)")
+    parser.add_argument("--fy-to", type=int, default=None, help="Last FY start year, inclusive (default: same as --fy-from)")
+    parser.add_argument("--name", action="append", choices=list(PEOPLE.keys()), help="Landlord to include (repeatable; default: all)")
+    parser.add_argument("--rent-overrides", help="CSV of name,period,rent overrides")
+
+
+def run(args) -> int:
+    fy_to = args.fy_to if args.fy_to is not None else args.fy_from
+    rent_overrides = load_rent_overrides(args.rent_overrides) if args.rent_overrides else None
+    df = build_schedule(args.name, range(args.fy_from, fy_to + 1), rent_overrides)
+    df.to_csv(args.out, index=False, date_format="%d/%m/%Y")
+    print(f"Wrote {len(df)} schedule rows to {args.out}")
+    return 0
@@ -0,0 +1,365 @@
+import asyncio
+import datetime
+import ipaddress
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+from rentbill import registry
+from rentbill.batch import InvoiceJob, job_invoice, render_job
+from rentbill.core import PEOPLE
+from rentbill.pdf_cache import PdfCache, invoice_key
+from rentbill.periods import period_index
+from rentbill.timing import timer
+
+# -----------------------------------
+# INVOICE SPEC
+# -----------------------------------
+def parse_spec(spec: dict) -> InvoiceJob:
+    """
+    {"landlord": <PEOPLE key>, "period": "YYYY-MM"} or explicit
+    "from_date"/"to_date" (ISO); optional "rent" and "invoice_no".
+    {"lease": <lease id>, ...} instead of "landlord" bills that lease's
+    tenant and property at its rent.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("Invoice spec must be a JSON object")
+    lease = None
+    if "lease" in spec:
+        lease = registry.current().lease_index.leases.get(spec["lease"])
+        if lease is None:
+            raise ValueError(f"Unknown lease: {spec['lease']!r}")
+        landlord = lease.landlord
+    else:
+        landlord = spec.get("landlord")
+    if landlord not in PEOPLE:
+        raise ValueError(f"Unknown landlord: {landlord!r}")
+
+    if "period" in spec:
+        year, month = (int(x) for x in str(spec["period"]).split("-"))
+        if not 1 <= month <= 12:
+            raise ValueError(f"Bad period: {spec['period']!r}")
+        p = period_index.for_date(datetime.date(year, month, 1))
+        from_date, to_date = p.from_date, p.to_date
+    else:
+        from_date = datetime.date.fromisoformat(spec["from_date"])
+        to_date = datetime.date.fromisoformat(spec["to_date"])
+    if to_date < from_date:
+        raise ValueError("to_date is earlier than from_date")
+
+    rent = float(spec.get("rent", lease.rent if lease else PEOPLE[landlord].default_rent))
+    if not math.isfinite(rent) or rent < 0:
+        raise ValueError("rent must be a finite, non-negative amount")
+
+    invoice_date = from_date.replace(day=1)
+    period = period_index.for_date(invoice_date)
+    return InvoiceJob(
+        person_key=landlord,
+        invoice_no=str(spec.get("invoice_no") or (lease.invoice_no(period) if lease else period.invoice_no)),
+        invoice_date=invoice_date,
+        from_date=from_date,
+        to_date=to_date,
+        rent=rent,
+        lease_id=lease.id if lease else None,
+        series=lease.series if lease else "",
+    )
+
+
+# -----------------------------------
+# ASYNC HTTP SERVICE
+# -----------------------------------
+MAX_BODY = 64 * 1024
+
+
+class Overloaded(Exception):
+    pass
+
+
+class WorkersCrashed(Exception):
+    pass
+
+
+class InvoiceService:
+    """
+    Renders run on a process pool. At most `max_concurrency` renders are
+    dispatched at once; up to `max_pending` more may wait, after which new
+    requests get 503 + Retry-After instead of queueing without bound.
+    Identical specs arriving together share one render. A pool broken by a
+    dead worker is replaced and the job retried once.
+    """
+
+    def __init__(self, workers: int = 0, max_concurrency: int | None = None, max_pending: int = 64,
+                 cache: PdfCache | None = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.max_concurrency = max_concurrency or self.workers
+        self.max_pending = max_pending
+        self.cache = cache if cache is not None else PdfCache()
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._waiting = 0
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.rendered = 0
+        self.rejected = 0
+        self.shared = 0
+        self.pool_restarts = 0
+
+    async def render(self, job: InvoiceJob) -> bytes:
+        key = invoice_key(**job_invoice(job))
+        pdf = self.cache.get(key)
+        if pdf is not None:
+            return pdf
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(self._render(key, job))
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.shared += 1
+        # shield: a client that disconnects doesn't cancel the render others await
+        return await asyncio.shield(task)
+
+    async def _render(self, key: str, job: InvoiceJob) -> bytes:
+        if self._slots.locked() and self._waiting >= self.max_pending:
+            self.rejected += 1
+            raise Overloaded()
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        try:
+            pdf = await self._submit(job)
+        finally:
+            self._slots.release()
+        self.rendered += 1
+        self.cache.put(key, pdf)
+        return pdf
+
+    async def _submit(self, job: InvoiceJob) -> bytes:
+        loop = asyncio.get_running_loop()
+        for _ in range(2):
+            pool = self.pool
+            try:
+                return await loop.run_in_executor(pool, render_job, job)
+            except BrokenProcessPool:
+                if pool is self.pool:  # the first job to notice replaces it
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    self.pool = ProcessPoolExecutor(max_workers=self.workers)
+                    self.pool_restarts += 1
+        raise WorkersCrashed()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "max_pending": self.max_pending,
+            "waiting": self._waiting,
+            "rendered": self.rendered,
+            "rejected": self.rejected,
+            "shared": self.shared,
+            "in_flight": len(self._inflight),
+            "pool_restarts": self.pool_restarts,
+            "cache": self.cache.stats(),
+        }
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    # -- HTTP --------------------------------------------------------------
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._send(writer, HTTPStatus.BAD_REQUEST, b"Malformed request line\n", keep_alive=False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                raw_length = headers.get("content-length") or "0"
+                if not (raw_length.isascii() and raw_length.isdigit()):
+                    await self._send(writer, HTTPStatus.BAD_REQUEST, b"Invalid Content-Length\n", keep_alive=False)
+                    break
+                length = int(raw_length)
+                if length > MAX_BODY:
+                    await self._send(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, b"Body too large\n", keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                status, payload, content_type, extra = await self._route(method, urlsplit(target).path, body)
+                await self._send(writer, status, payload, content_type, keep_alive, extra)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes):
+        if path == "/health":
+            return HTTPStatus.OK, json.dumps(self.stats()).encode(), "application/json", {}
+        if path == "/metrics":
+            return HTTPStatus.OK, timer.to_prometheus().encode(), "text/plain; version=0.0.4", {}
+        if path != "/invoice":
+            return HTTPStatus.NOT_FOUND, b"Not found\n", "text/plain", {}
+        if method != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, b"POST an invoice spec\n", "text/plain", {"Allow": "POST"}
+
+        if registry.refresh():
+            self.cache.clear()  # entries for the old registry can no longer be hit
+        try:
+            job = parse_spec(json.loads(body or b"null"))
+        except (ValueError, KeyError, TypeError) as e:
+            return HTTPStatus.BAD_REQUEST, f"{e}\n".encode(), "text/plain", {}
+
+        try:
+            with timer.stage("http.render"):
+                pdf = await self.render(job)
+        except Overloaded:
+            return HTTPStatus.SERVICE_UNAVAILABLE, b"Busy, retry shortly\n", "text/plain", {"Retry-After": "1"}
+        except WorkersCrashed:
+            return HTTPStatus.SERVICE_UNAVAILABLE, b"Render workers restarting, retry shortly\n", "text/plain", {
+                "Retry-After": "1",
+            }
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(e).__name__}: {e}\n".encode(), "text/plain", {}
+        return HTTPStatus.OK, pdf, "application/pdf", {
+            "Content-Disposition": f'inline; filename="{job.file_name}"',
+        }
+
+    @staticmethod
+    async def _send(writer, status: HTTPStatus, payload: bytes, content_type: str = "text/plain",
+                    keep_alive: bool = True, extra: dict | None = None) -> None:
+        head = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(payload)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        head += [f"{k}: {v}" for k, v in (extra or {}).items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+        await writer.drain()
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8765, **service_kwargs) -> None:
+    if host != "localhost" and not ipaddress.ip_address(host).is_loopback:
+        raise ValueError("The invoice service only binds to a loopback address")
+    service = InvoiceService(**service_kwargs)
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"Serving invoices on http://{host}:{port}/invoice "
+          f"(workers={service.workers}, concurrency={service.max_concurrency}, pending={service.max_pending})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+# -----------------------------------
+# LOAD TEST
+# -----------------------------------
+async def _client(host, port, bodies: list[bytes], offset: int, n: int, latencies: list, statuses: dict) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for i in range(n):
+            body = bodies[(offset + i) % len(bodies)]
+            t0 = time.perf_counter()
+            writer.write((
+                f"POST /invoice HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n"
+            ).encode() + body)
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - t0)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def load_test(host: str, port: int, specs: list[dict], concurrency: int = 16, requests: int = 500) -> dict:
+    """Keep-alive clients cycling through `specs`; reports requests/sec and latency percentiles."""
+    latencies, statuses = [], {}
+    bodies = [json.dumps(s).encode() for s in specs]
+    per_client = max(1, requests // concurrency)
+    t0 = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, bodies, i * per_client, per_client, latencies, statuses)
+        for i in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+
+    def pct(q):
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "requests_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+        "statuses": statuses,
+    }
+
+
+# -----------------------------------
+# CLI
+# -----------------------------------
+def add_arguments(parser):
+    parser.add_argument("--host", default="127.0.0.1", help="Loopback address to bind (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=8765, help="Port (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=0, help="Render processes; 0 = one per CPU (default: %(default)s)")
+    parser.add_argument("--max-concurrency", type=int, default=None, help="Renders in flight (default: workers)")
+    parser.add_argument("--max-pending", type=int, default=64, help="Renders allowed to wait before 503 (default: %(default)s)")
+    parser.add_argument("--load-test", action="store_true",
+                        help="Instead of serving, load-test a running service at --host/--port")
+    parser.add_argument("--concurrency", type=int, default=16, help="Load test: parallel connections (default: %(default)s)")
+    parser.add_argument("--requests", type=int, default=500, help="Load test: total requests (default: %(default)s)")
+    parser.add_argument("--distinct", type=int, default=36,
+                        help="Load test: distinct invoice specs to cycle through (default: %(default)s)")
+
+
+def run(args) -> int:
+    if args.load_test:
+        keys = list(PEOPLE)
+        specs = [
+            {"landlord": keys[i % len(keys)], "period": f"{2026 + i // 12}-{(i % 12) + 1:02d}", "rent": 100000 + i}
+            for i in range(args.distinct)
+        ]
+        result = asyncio.run(load_test(args.host, args.port, specs, args.concurrency, args.requests))
+        print(json.dumps(result, indent=2))
+        return 0
+
+    try:
+        asyncio.run(serve(args.host, args.port, workers=args.workers, max_concurrency=args.max_concurrency,
+                          max_pending=args.max_pending))
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -0,0 +1,190 @@
+import random
+import time
+
+from rentbill.ledger import InvoiceLedger, LedgerEntry
+
+# -----------------------------------
+# GOOGLE SHEETS SYNC
+# -----------------------------------
+HEADER = [
+    "Landlord", "FY", "Seq", "Invoice No", "Invoice Date", "From", "To",
+    "Rent", "SGST", "CGST", "Total", "PDF SHA256",
+]
+
+
+def _row_key(row: list) -> tuple[str, str]:
+    return row[HEADER.index("Landlord")], row[HEADER.index("Invoice No")]
+
+
+def entry_row(e: LedgerEntry) -> list:
+    return [
+        e.landlord, e.fy, e.seq, e.invoice_no,
+        e.invoice_date.strftime("%d/%m/%Y"), e.period_from.strftime("%d/%m/%Y"), e.period_to.strftime("%d/%m/%Y"),
+        e.rent, e.sgst, e.cgst, e.total, e.pdf_sha256 or "",
+    ]
+
+
+class QuotaError(Exception):
+    """
+    Raised by backends for rate-limit / transient errors worth retrying,
+    including ones where the request may already have been applied.
+    """
+
+
+class GspreadBackend:
+    """
+    One authorized gspread client (and its pooled HTTP session) per backend;
+    every append is a single values_append request.
+    """
+
+    def __init__(self, spreadsheet_key: str, worksheet: str = "Invoices", credentials_file: str | None = None,
+                 credentials_info: dict | None = None):
+        import gspread
+        import requests
+
+        if credentials_info is not None:
+            self.client = gspread.service_account_from_dict(credentials_info)
+        else:
+            self.client = gspread.service_account(filename=credentials_file) if credentials_file else gspread.service_account()
+        self.spreadsheet = self.client.open_by_key(spreadsheet_key)
+        self.worksheet = self.spreadsheet.worksheet(worksheet)
+        self._api_error = gspread.exceptions.APIError
+        self._transport_errors = (requests.exceptions.Timeout, requests.exceptions.ConnectionError)
+
+    def _call(self, fn, *args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        except self._transport_errors as e:
+            raise QuotaError(str(e)) from e
+        except self._api_error as e:
+            status = getattr(getattr(e, "response", None), "status_code", None)
+            if status in (429, 500, 502, 503):
+                raise QuotaError(str(e)) from e
+            raise
+
+    def key_rows(self) -> list[tuple[str, str]]:
+        """(Landlord, Invoice No) of every row already in the sheet, header included."""
+        landlords = self._call(self.worksheet.col_values, HEADER.index("Landlord") + 1)
+        invoice_nos = self._call(self.worksheet.col_values, HEADER.index("Invoice No") + 1)
+        invoice_nos += [""] * (len(landlords) - len(invoice_nos))
+        return list(zip(landlords, invoice_nos))
+
+    def append_rows(self, rows: list[list]) -> None:
+        self._call(
+            self.spreadsheet.values_append,
+            f"'{self.worksheet.title}'!A1",
+            params={"valueInputOption": "USER_ENTERED", "insertDataOption": "INSERT_ROWS"},
+            body={"values": rows},
+        )
+
+
+class FakeSheetsBackend:
+    """
+    In-memory stand-in for the Sheets API. `fail_times` quota errors are
+    raised first; then `lost_replies` appends are applied but still fail,
+    like a request that timed out after Sheets wrote it.
+    """
+
+    def __init__(self, fail_times: int = 0, lost_replies: int = 0):
+        self.rows = []
+        self.calls = 0
+        self.fail_times = fail_times
+        self.lost_replies = lost_replies
+
+    def key_rows(self) -> list[tuple[str, str]]:
+        return [(r[HEADER.index("Landlord")], r[HEADER.index("Invoice No")]) for r in self.rows]
+
+    def append_rows(self, rows: list[list]) -> None:
+        self.calls += 1
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise QuotaError("429: Quota exceeded (fake)")
+        self.rows.extend(list(r) for r in rows)
+        if self.lost_replies > 0:
+            self.lost_replies -= 1
+            raise QuotaError("503: Service unavailable (fake, append applied)")
+
+
+def _with_retry(fn, retries: int, backoff: float, sleep, before_retry=None):
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except QuotaError:
+            if attempt == retries:
+                raise
+            # Exponential backoff with jitter, as the Sheets quota docs recommend
+            sleep(backoff * (2 ** attempt) + random.uniform(0, backoff))
+            if before_retry is not None:
+                before_retry()
+
+
+def _append_chunk(backend, chunk: list[list], retries: int, backoff: float, sleep) -> None:
+    """
+    Append one chunk, retrying quota errors. An append is not idempotent: a
+    failed one may still have been applied, so before each retry the sheet
+    is re-read and rows already in it are dropped from the chunk.
+    """
+    def drop_present():
+        present = set(_with_retry(backend.key_rows, retries, backoff, sleep))
+        chunk[:] = [r for r in chunk if _row_key(r) not in present]
+
+    def append():
+        if chunk:
+            backend.append_rows(chunk)
+
+    _with_retry(append, retries, backoff, sleep, before_retry=drop_present)
+
+
+def sync_invoices(
+    entries,
+    backend,
+    chunk_rows: int = 5000,
+    retries: int = 5,
+    backoff: float = 1.0,
+    sleep=time.sleep,
+) -> int:
+    """
+    Append ledger entries to the sheet: one API call per `chunk_rows` rows
+    (a year for every landlord fits in one), retrying quota errors.
+
+    Invoices already in the sheet (same landlord and invoice number) are
+    skipped, so re-running a sync only sends what is new. Within one run a
+    re-issue replaces the earlier entry; a re-issue of an invoice that was
+    already synced is not sent again. Returns the number of invoice rows
+    written (not counting the header).
+    """
+    existing = _with_retry(backend.key_rows, retries, backoff, sleep)
+    seen = set(existing)
+    latest = {}
+    for e in entries:
+        if (e.landlord, e.invoice_no) not in seen:
+            latest[e.landlord, e.invoice_no] = e
+    rows = [entry_row(e) for e in latest.values()]
+    if not rows:
+        return 0
+    if not existing:
+        rows.insert(0, HEADER)
+
+    for i in range(0, len(rows), chunk_rows):
+        _append_chunk(backend, rows[i:i + chunk_rows], retries, backoff, sleep)
+    return len(latest)
+
+
+# -----------------------------------
+# CLI
+# -----------------------------------
+def add_arguments(parser):
+    parser.add_argument("--ledger", required=True, help="SQLite invoice ledger to read from")
+    parser.add_argument("--fy", required=True, help='FY label to sync, e.g. "2026-27"')
+    parser.add_argument("--sheet", required=True, help="Spreadsheet key")
+    parser.add_argument("--worksheet", default="Invoices", help="Worksheet title (default: %(default)s)")
+    parser.add_argument("--credentials", help="Service account JSON (default: gspread's standard location)")
+
+
+def run(args) -> int:
+    with InvoiceLedger(args.ledger) as ledger:
+        entries = ledger.invoices_for_fy(args.fy)
+    backend = GspreadBackend(args.sheet, worksheet=args.worksheet, credentials_file=args.credentials)
+    n = sync_invoices(entries, backend)
+    print(f"Synced {n} new invoice rows to {args.worksheet}")
+    return 0
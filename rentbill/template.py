@@ -0,0 +1,451 @@
+import datetime
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import astuple
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+
+from rentbill.core import (
+    RECIPIENT,
+    Person,
+    format_money,
+    normalize_text_for_display,
+    rent_line,
+)
+from rentbill.layout import wrap_lines, wrap_words
+from rentbill.timing import timer
+
+# -----------------------------------
+# INVOICE TEMPLATE
+# -----------------------------------
+# Registered in this order before anything is drawn, so a fresh canvas always
+# maps them to the same internal font names and compiled ops can be replayed.
+TEMPLATE_FONTS = ("Helvetica", "Helvetica-Bold")
+
+
+def _can_replay(c) -> bool:
+    # Replaying compiled ops uses reportlab internals (requirements.txt pins a
+    # range where they exist); without them static parts are drawn normally
+    return isinstance(getattr(c, "_code", None), list) and hasattr(getattr(c, "_doc", None), "getInternalFontName")
+
+BORDER = colors.HexColor("#BFC5CE")
+SOFT_LINE = colors.HexColor("#C9D1DB")
+TEXT = colors.HexColor("#222222")
+MUTED = colors.HexColor("#666666")
+TITLE = colors.HexColor("#42526b")
+SIG_LINE = colors.HexColor("#cccccc")
+RULE_W = 1.1
+
+# Where the tax/total rows, amount in words and signature go on the last page,
+# preferred first: (words beside the signature, signature in the low band)
+TAIL_PLACEMENTS = ((False, False), (True, False), (False, True), (True, True))
+
+
+class InvoiceTemplate:
+    """
+    Static layer of an invoice for one (Person, theme, recipient): frame, bars and
+    headings, the provider/recipient blocks on page one, and the signature.
+    Each part is drawn once per document as a Form XObject; pages place the
+    forms and stamp the invoice-specific fields and the table rows, which
+    flow onto continuation pages when there are many.
+    """
+
+    def __init__(self, person: Person, theme: dict, recipient: dict | None = None):
+        self.person = person
+        self.theme = theme
+        self.recipient = recipient or RECIPIENT
+        self.form_name = "invoice_" + hashlib.sha1(
+            repr((astuple(person), sorted(theme.items()), sorted(self.recipient.items()))).encode("utf-8")
+        ).hexdigest()[:16]
+        # Content-stream ops of the form, keyed on the canvas' font name mapping
+        self._compiled = {}
+
+        self.accent = colors.HexColor(theme["primary"])
+        self.light_bg = colors.HexColor(theme["light_bg"])
+
+        W, H = A4
+        margin = 24
+        self.left, self.right = margin, W - margin
+        self.top, self.bottom = H - margin, margin
+        self.bar_h = 14
+
+        self.header_top = self.top - self.bar_h - 22
+        self.header_right_w = 300
+        self.header_right_x = self.right - 18 - self.header_right_w
+        self.meta_h = 56
+        self.meta_y = self.header_top - 78
+
+        self.table_x = self.left + 18
+        self.table_w = self.right - 18 - self.table_x
+        self.header_h = 30
+        self.row_h = 30
+        self.line_h = 12
+        self.desc_w = self.table_w - 12 - 140
+
+        # Vertical position of the table depends on the provider/recipient
+        # blocks above it; walk them once without drawing. Continuation pages
+        # start the table under the invoice no / date box.
+        self.table_y = self._draw_blocks(None)
+        self.cont_table_y = self.meta_y - 24
+
+        # Item rows stop above the page number; the last baseline of the
+        # amount in words has to clear the signature block. Invoices that
+        # need the room get the signature in the band above the footer bar.
+        self.sig_y = self.bottom + self.bar_h + 26
+        self.sig_y_low = self.bottom + self.bar_h + 6
+        self.sig_x = self.right - 18 - 260
+        self.rows_floor = self.bottom + self.bar_h + 20
+        self.tail_floor = self.sig_y + 60 + 12
+        self.tail_floor_low = self.sig_y_low + 60 + 12
+        # Words beside the signature wrap in the column left of it and may
+        # run down to rows_floor
+        self.words_narrow_w = self.sig_x - 18 - self.table_x
+
+    # -- static layer ------------------------------------------------------
+    def _draw_blocks(self, c):
+        """Provider, recipient and key-value blocks. Returns the table top y.
+        With c=None only the layout is computed."""
+        person, recipient = self.person, self.recipient
+        left, right = self.left, self.right
+
+        def draw_txt(x, y, s, size=10, bold=False, col=TEXT):
+            if c is not None:
+                c.setFillColor(col)
+                c.setFont("Helvetica-Bold" if bold else "Helvetica", size)
+                c.drawString(x, y, s)
+
+        def hline(y):
+            if c is not None:
+                c.setStrokeColor(SOFT_LINE)
+                c.setLineWidth(RULE_W)
+                c.line(left + 14, y, right - 14, y)
+
+        header_left_x = left + 18
+        addr_y = self.header_top - 45
+        draw_txt(header_left_x, addr_y, f"Name: {person.name}", size=12, bold=True)
+        addr_y -= 20
+
+        for line in person.address_lines:
+            draw_txt(header_left_x, addr_y, normalize_text_for_display(line, for_html=False), size=10)
+            addr_y -= 16
+        addr_y -= 8
+
+        y = addr_y
+        y -= 10
+        hline(y)
+
+        y -= 22
+        draw_txt(left + 18, y, recipient["name"], size=10, bold=True)
+        y -= 16
+
+        for line in recipient["address_lines"]:
+            draw_txt(left + 18, y, normalize_text_for_display(line, for_html=False), size=10)
+            y -= 15
+
+        y -= 8
+        draw_txt(left + 18, y, "GSTIN of recipient :", size=10, bold=False)
+        draw_txt(left + 170, y, recipient["gstin"], size=10, bold=True)
+
+        y -= 18
+        hline(y)
+        y -= 18
+
+        label_x = left + 18
+        colon_x = left + 310
+        value_x = left + 325
+        max_val_w = right - 18 - value_x
+
+        def kv(label, value, extra_after=6):
+            nonlocal y
+            draw_txt(label_x, y, label, size=10, bold=False)
+            draw_txt(colon_x, y, ":", size=10, bold=False, col=MUTED)
+            for ln in wrap_lines(value, "Helvetica", 10, max_val_w):
+                draw_txt(value_x, y, ln, size=10, bold=False)
+                y -= 14
+            y -= extra_after
+
+        # PAN (bold value)
+        draw_txt(label_x, y, "PAN Number of Service Provider", size=10, bold=False)
+        draw_txt(colon_x, y, ":", size=10, bold=False, col=MUTED)
+        draw_txt(value_x, y, person.pan, size=10, bold=True)
+        y -= 18
+
+        # GST Registration (bold value)
+        draw_txt(label_x, y, "GST Registration Number of Service Provider", size=10, bold=False)
+        draw_txt(colon_x, y, ":", size=10, bold=False, col=MUTED)
+        draw_txt(value_x, y, person.gst, size=10, bold=True)
+        y -= 18
+
+        kv("Service Accounting Code (SAC)", person.sac, extra_after=8)
+        kv("Description of Service Accounting Code (SAC)", person.desc, extra_after=16)
+        # Location (force single line)
+        draw_txt(label_x, y, "Location of Service Provided", size=10, bold=False)
+        draw_txt(colon_x, y, ":", size=10, bold=False, col=MUTED)
+        draw_txt(value_x, y, person.location, size=9, bold=False)
+        y -= 20
+        kv("State Code of Service Location", person.state_code, extra_after=10)
+        kv("State Name of Service Location", person.state_name, extra_after=12)
+
+        y -= 8
+        return y
+
+    def _draw_frame(self, c):
+        """Border, bars, title and the (empty) invoice no / date box: every page has these."""
+        left, right, top, bottom = self.left, self.right, self.top, self.bottom
+
+        # Frame
+        c.setStrokeColor(BORDER)
+        c.setLineWidth(1.2)
+        c.rect(left, bottom, right - left, top - bottom, stroke=1, fill=0)
+
+        c.setFillColor(self.accent)
+        c.rect(left, top - self.bar_h, right - left, self.bar_h, stroke=0, fill=1)
+        c.rect(left, bottom, right - left, self.bar_h, stroke=0, fill=1)
+
+        title_y = self.header_top
+        c.setFillColor(TITLE)
+        c.setFont("Helvetica-Bold", 20)
+        c.drawString((left + right) / 2 - 55, title_y, "TAX INVOICE")
+        c.setFillColor(MUTED)
+        c.setFont("Helvetica", 10)
+        c.drawRightString(right - 18, title_y + 2, "Original for Recipient")
+
+        c.setStrokeColor(BORDER)
+        c.setFillColor(colors.white)
+        c.roundRect(self.header_right_x, self.meta_y, self.header_right_w, self.meta_h, 10, stroke=1, fill=1)
+
+    def draw_first_page(self, c):
+        self._draw_frame(c)
+        self._draw_blocks(c)
+
+    def draw_signature(self, c, low: bool = False):
+        sig_x = self.sig_x
+        sig_y = self.sig_y_low if low else self.sig_y
+        c.setFillColor(TEXT)
+        c.setFont("Helvetica-Bold", 10)
+        c.drawString(sig_x, sig_y + 60, "Signature:")
+        c.setStrokeColor(SIG_LINE)
+        c.setLineWidth(RULE_W)
+        c.line(sig_x, sig_y + 44, sig_x + 200, sig_y + 44)
+        c.drawString(sig_x, sig_y + 22, "Name :")
+        c.setFont("Helvetica-Bold", 9)
+        c.drawString(sig_x + 90, sig_y + 4, "Authorised Signatory")
+
+    def ensure_form(self, c, part: str, draw_fn) -> str:
+        """Define one static part as a form on the canvas' document (once per document)."""
+        name = f"{self.form_name}_{part}"
+        if c.hasForm(name):
+            return name
+        if not _can_replay(c):
+            c.beginForm(name)
+            draw_fn(c)
+            c.endForm()
+            return name
+        font_names = tuple(c._doc.getInternalFontName(f) for f in TEMPLATE_FONTS)
+        c.beginForm(name)
+        ops = self._compiled.get((part, font_names))
+        if ops is None:
+            draw_fn(c)
+            self._compiled[(part, font_names)] = list(c._code)
+        else:
+            c._code.extend(ops)
+        c.endForm()
+        return name
+
+    def _page_form(self, c, first: bool, single: bool, sig_low: bool) -> str:
+        # One-page invoices (the usual case) get everything in a single form
+        if single:
+            return self.ensure_form(c, "one_low" if sig_low else "one",
+                                    lambda c: (self.draw_first_page(c), self.draw_signature(c, sig_low)))
+        if first:
+            return self.ensure_form(c, "p1", self.draw_first_page)
+        return self.ensure_form(c, "pn", self._draw_frame)
+
+    # -- table layout ------------------------------------------------------
+    def table_rows(self, items) -> list[tuple[tuple[str, ...], float, float]]:
+        """(description lines, amount, row height) per item; long descriptions wrap inside the row."""
+        rows = []
+        for item in items:
+            lines = wrap_words(item.description, "Helvetica", 10, self.desc_w) or ("",)
+            rows.append((lines, item.amount, self.row_h + (len(lines) - 1) * self.line_h))
+        return rows
+
+    def paginate(self, heights, place_tail):
+        """
+        Row indices per page, filled greedily top to bottom (linear in rows),
+        and the placement `place_tail(y)` picks for the tax/total rows, amount
+        in words and signature below the last row. When it returns None they
+        don't fit, and the last row moves to a new page with them.
+        """
+        pages = [[]]
+        y = self.table_y - self.header_h
+        for i, h in enumerate(heights):
+            if pages[-1] and y - h < self.rows_floor:
+                pages.append([])
+                y = self.cont_table_y - self.header_h
+            pages[-1].append(i)
+            y -= h
+        placement = place_tail(y)
+        if placement is None:
+            moved = [pages[-1].pop()] if len(pages[-1]) > 1 else []
+            pages.append(moved)
+            placement = place_tail(self.cont_table_y - self.header_h - sum(heights[i] for i in moved))
+        return pages, placement
+
+    def _draw_table_head(self, c, y, body_h):
+        tx, tw = self.table_x, self.table_w
+        c.setStrokeColor(BORDER)
+        c.setLineWidth(RULE_W)
+        c.roundRect(tx, y - self.header_h - body_h, tw, self.header_h + body_h, 10, stroke=1, fill=0)
+
+        c.setFillColor(self.accent)
+        c.roundRect(tx, y - self.header_h, tw, self.header_h, 10, stroke=0, fill=1)
+        c.setFillColor(colors.white)
+        c.setFont("Helvetica-Bold", 10)
+        c.drawString(tx + 12, y - 20, "Particulars")
+        c.drawRightString(tx + tw - 12, y - 20, "Amt Rs")
+
+    def _draw_tail(self, c, y, sgst, cgst, total):
+        """SGST, CGST and Total rows starting at row top `y`."""
+        tx, tw = self.table_x, self.table_w
+        amt_x = tx + tw - 12
+        c.setFillColor(TEXT)
+        c.setFont("Helvetica", 10)
+        c.drawRightString(tx + tw - 80, y - 20, "SGST @ 9%")
+        c.drawRightString(amt_x, y - 20, format_money(sgst))
+        c.drawRightString(tx + tw - 80, y - self.row_h - 20, "CGST @ 9%")
+        c.drawRightString(amt_x, y - self.row_h - 20, format_money(cgst))
+
+        total_y = y - 2 * self.row_h
+        c.setFillColor(self.light_bg)
+        c.rect(tx, total_y - self.row_h, tw, self.row_h, stroke=0, fill=1)
+        c.setFillColor(TEXT)
+        c.setFont("Helvetica-Bold", 10)
+        c.drawString(tx + 12, total_y - 20, "Total")
+        c.drawRightString(amt_x, total_y - 20, format_money(total))
+
+    def _tail_fits(self, y: float, n_words: int, beside: bool, low: bool) -> bool:
+        """Whether the tail fits below row bottom `y`: words full width above the signature, or `beside` it."""
+        floor = self.tail_floor_low if low else self.tail_floor
+        totals_y = y - 3 * self.row_h
+        words_y = totals_y - 18 - (n_words - 1) * 13
+        if beside:
+            return totals_y >= floor and words_y >= self.rows_floor
+        return words_y >= floor
+
+    def layout(self, items, amount_words: str):
+        """(table rows, amount-in-words lines, row indices per page, signature in the low band) for one invoice."""
+        rows = self.table_rows(items)
+        text = f"Amount in words: {amount_words}"
+        wrapped = {False: wrap_lines(text, "Helvetica", 10, self.table_w)}
+
+        def place_tail(y):
+            for beside, low in TAIL_PLACEMENTS:
+                if beside not in wrapped:
+                    wrapped[beside] = wrap_lines(text, "Helvetica", 10, self.words_narrow_w)
+                if self._tail_fits(y, len(wrapped[beside]), beside, low):
+                    return beside, low
+            return None
+
+        pages, placement = self.paginate([h for _, _, h in rows], place_tail)
+        beside, low = placement or TAIL_PLACEMENTS[0]
+        return rows, wrapped[beside], pages, low
+
+    # -- variable layer ----------------------------------------------------
+    def draw(
+        self,
+        c,
+        invoice_no: str,
+        invoice_date: datetime.date,
+        from_date: datetime.date,
+        to_date: datetime.date,
+        rent: float,
+        sgst: float,
+        cgst: float,
+        total: float,
+        amount_words: str,
+        items=None,
+    ):
+        """Stamp one invoice. Calls c.showPage() between pages but not after the last one."""
+        laps = timer.laps("pdf")
+        rows, words, pages, sig_low = self.layout(items or (rent_line(from_date, to_date, rent),), amount_words)
+        laps.lap("layout")
+
+        tx, tw = self.table_x, self.table_w
+        amt_x = tx + tw - 12
+        for page_no, page in enumerate(pages):
+            first, last = page_no == 0, page_no == len(pages) - 1
+            if not first:
+                c.showPage()
+            c.doForm(self._page_form(c, first, last and first, sig_low))
+            laps.lap("static_form")
+
+            c.setFillColor(TEXT)
+            c.setFont("Helvetica-Bold", 10)
+            x = self.header_right_x + 14
+            c.drawString(x, self.meta_y + 34, f"Invoice No.   {invoice_no}")
+            c.drawString(x, self.meta_y + 16, f"Date: {invoice_date.strftime('%d/%m/%Y')}")
+            if len(pages) > 1:
+                c.setFillColor(MUTED)
+                c.setFont("Helvetica", 8)
+                c.drawRightString(self.right - 18, self.bottom + self.bar_h + 6, f"Page {page_no + 1} of {len(pages)}")
+            laps.lap("header")
+
+            top = self.table_y if first else self.cont_table_y
+            body_h = sum(rows[i][2] for i in page) + (3 * self.row_h if last else 0)
+            self._draw_table_head(c, top, body_h)
+
+            y = top - self.header_h
+            c.setFillColor(TEXT)
+            c.setFont("Helvetica", 10)
+            for i in page:
+                lines, amount, h = rows[i]
+                for k, ln in enumerate(lines):
+                    c.drawString(tx + 12, y - 20 - k * self.line_h, ln)
+                c.drawRightString(amt_x, y - 20, format_money(amount))
+                y -= h
+            if not last:
+                laps.lap("table")
+                continue
+            self._draw_tail(c, y, sgst, cgst, total)
+            laps.lap("table")
+
+            y -= 3 * self.row_h + 18
+            c.setFont("Helvetica", 10)
+            for ln in words:
+                c.drawString(tx, y, ln)
+                y -= 13
+            if not first:
+                c.doForm(self.ensure_form(c, "sig_low" if sig_low else "sig",
+                                          lambda c: self.draw_signature(c, sig_low)))
+            laps.lap("words")
+
+
+# LRU of templates (with their compiled form ops). Registry reloads and lease
+# properties (each a distinct Person) keep adding keys in a long-lived process.
+TEMPLATE_CACHE_SIZE = 256
+
+_templates = OrderedDict()
+_templates_lock = threading.Lock()
+
+
+def get_template(person: Person, theme: dict, recipient: dict | None = None) -> InvoiceTemplate:
+    """`recipient` defaults to RECIPIENT as it is now (the registry may have reloaded it)."""
+    recipient = recipient or RECIPIENT
+    key = repr((astuple(person), sorted(theme.items()), sorted(recipient.items())))
+    with _templates_lock:
+        tpl = _templates.get(key)
+        if tpl is not None:
+            _templates.move_to_end(key)
+            return tpl
+        tpl = _templates[key] = InvoiceTemplate(person, theme, dict(recipient))
+        while len(_templates) > TEMPLATE_CACHE_SIZE:
+            _templates.popitem(last=False)
+    return tpl
+
+
+def clear_templates() -> None:
+    with _templates_lock:
+        _templates.clear()
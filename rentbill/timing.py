@@ -0,0 +1,129 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+# -----------------------------------
+# STAGE TIMINGS
+# -----------------------------------
+_NULL = nullcontext()
+
+
+def _percentile(sorted_vals, q):
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * len(sorted_vals)))] if sorted_vals else 0.0
+
+
+class _Stage:
+    __slots__ = ("timer", "name", "t0")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.record(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+class Laps:
+    """Times a linear script: each lap(name) records the time since the previous lap."""
+
+    __slots__ = ("timer", "prefix", "t")
+
+    def __init__(self, timer, prefix):
+        self.timer = timer
+        self.prefix = prefix
+        self.t = time.perf_counter()
+
+    def lap(self, name: str) -> None:
+        now = time.perf_counter()
+        self.timer.record(f"{self.prefix}.{name}", now - self.t)
+        self.t = now
+
+
+class _NullLaps:
+    __slots__ = ()
+
+    def lap(self, name: str) -> None:
+        pass
+
+
+_NULL_LAPS = _NullLaps()
+
+
+class StageTimer:
+    """
+    Process-wide ring buffer of (timestamp, stage, seconds). Off by default;
+    while off, stage()/laps() hand back shared no-op objects so the hot path
+    pays one attribute check.
+    """
+
+    def __init__(self, maxlen: int = 4096, enabled: bool = False):
+        self.enabled = enabled
+        self._buf = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def stage(self, name: str):
+        return _Stage(self, name) if self.enabled else _NULL
+
+    def laps(self, prefix: str):
+        return Laps(self, prefix) if self.enabled else _NULL_LAPS
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._buf.append((time.time(), name, seconds))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buf.clear()
+
+    def snapshot(self) -> list[tuple]:
+        with self._lock:
+            return list(self._buf)
+
+    def summary(self) -> dict:
+        by_stage = {}
+        for _, name, secs in self.snapshot():
+            by_stage.setdefault(name, []).append(secs)
+        out = {}
+        for name, vals in sorted(by_stage.items()):
+            last = vals[-1]
+            vals.sort()
+            out[name] = {
+                "count": len(vals),
+                "total_ms": sum(vals) * 1000,
+                "p50_ms": _percentile(vals, 0.50) * 1000,
+                "p95_ms": _percentile(vals, 0.95) * 1000,
+                "max_ms": vals[-1] * 1000,
+                "last_ms": last * 1000,
+            }
+        return out
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "summary": self.summary(),
+            "events": [{"ts": ts, "stage": name, "ms": secs * 1000} for ts, name, secs in self.snapshot()],
+        }, indent=2)
+
+    def to_prometheus(self) -> str:
+        lines = [
+            "# HELP rentbill_stage_seconds Stage durations over the in-memory ring buffer window.",
+            "# TYPE rentbill_stage_seconds summary",
+        ]
+        for name, s in self.summary().items():
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'rentbill_stage_seconds{{stage="{label}",quantile="0.5"}} {s["p50_ms"] / 1000:.9f}')
+            lines.append(f'rentbill_stage_seconds{{stage="{label}",quantile="0.95"}} {s["p95_ms"] / 1000:.9f}')
+            lines.append(f'rentbill_stage_seconds_sum{{stage="{label}"}} {s["total_ms"] / 1000:.9f}')
+            lines.append(f'rentbill_stage_seconds_count{{stage="{label}"}} {s["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+timer = StageTimer(enabled=os.environ.get("RENTBILL_TIMING", "") not in ("", "0"))
+stage = timer.stage
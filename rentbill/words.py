@@ -0,0 +1,154 @@
+import functools
+import operator
+import random
+
+# -----------------------------------
+# AMOUNT IN WORDS (Indian numbering)
+# -----------------------------------
+ONES = ["", "One", "Two", "Three", "Four", "Five", "Six", "Seven", "Eight", "Nine", "Ten",
+        "Eleven", "Twelve", "Thirteen", "Fourteen", "Fifteen", "Sixteen", "Seventeen", "Eighteen", "Nineteen"]
+TENS = ["", "", "Twenty", "Thirty", "Forty", "Fifty", "Sixty", "Seventy", "Eighty", "Ninety"]
+
+def _two_digits(n: int) -> str:
+    if n < 20:
+        return ONES[n]
+    t = n // 10
+    o = n % 10
+    return (TENS[t] + (" " + ONES[o] if o else "")).strip()
+
+def reference_words(n: int) -> str:
+    """The original speller, kept as the oracle for `python -m rentbill words --verify`."""
+    if n == 0:
+        return "Zero"
+    parts = []
+    crore = n // 10000000
+    n %= 10000000
+    lakh = n // 100000
+    n %= 100000
+    thousand = n // 1000
+    n %= 1000
+    hundred = n // 100
+    n %= 100
+    if crore:
+        parts.append(f"{reference_words(crore)} Crore")
+    if lakh:
+        parts.append(f"{_two_digits(lakh)} Lakh")
+    if thousand:
+        parts.append(f"{_two_digits(thousand)} Thousand")
+    if hundred:
+        parts.append(f"{ONES[hundred]} Hundred")
+    if n:
+        if hundred:
+            parts.append("and " + _two_digits(n))
+        else:
+            parts.append(_two_digits(n))
+    return " ".join([p for p in parts if p]).strip()
+
+
+LAKH = 100000
+CRORE = 10000000
+
+
+@functools.cache
+def _table() -> tuple[str, ...]:
+    """Words for 0..99,999 ("" for 0). Built on first use (~20 ms), not at import."""
+    below_100 = [_two_digits(n) for n in range(100)]
+    below_1000 = below_100 + [
+        f"{ONES[h]} Hundred" + (f" and {below_100[r]}" if r else "") for h in range(1, 10) for r in range(100)
+    ]
+    table = list(below_1000)
+    for t in range(1, 100):
+        head = f"{below_100[t]} Thousand"
+        table.append(head)
+        table.extend(f"{head} {below_1000[r]}" for r in range(1, 1000))
+    return tuple(table)
+
+
+def _spell(n: int, table) -> str:
+    # n >= 1: the table covers the last five digits, "Lakh" the next two, "Crore" everything above
+    if n < LAKH:
+        return table[n]
+    crore, rest = divmod(n, CRORE)
+    lakh, low = divmod(rest, LAKH)
+    parts = [f"{_spell(crore, table)} Crore"] if crore else []
+    if lakh:
+        parts.append(f"{table[lakh]} Lakh")
+    if low:
+        parts.append(table[low])
+    return " ".join(parts)
+
+
+def number_to_words_indian(n: int) -> str:
+    n = operator.index(n)
+    if n < 0:
+        raise ValueError(f"Cannot spell a negative amount: {n}")
+    return _spell(n, _table()) if n else "Zero"
+
+
+def _paise_words(paise: int, table) -> str:
+    if paise < 0:
+        raise ValueError(f"Cannot spell a negative amount: {paise / 100:.2f}")
+    rupees, paise = divmod(paise, 100)
+    if not paise:
+        return f"{_spell(rupees, table) if rupees else 'Zero'} Only"
+    if not rupees:
+        return f"{table[paise]} Paise Only"
+    return f"{_spell(rupees, table)} and {table[paise]} Paise Only"
+
+
+def amount_to_words(amount: float) -> str:
+    """Rupees as printed on the invoice: "... Only", or "... and Fifty Paise Only" when there are paise."""
+    return _paise_words(int(round(amount * 100)), _table())
+
+
+def amounts_to_words(amounts) -> list[str]:
+    """amount_to_words() over a whole column (list, Series or array); each distinct amount is spelled once."""
+    if hasattr(amounts, "tolist"):
+        amounts = amounts.tolist()
+    table = _table()
+    memo = {}
+    out = []
+    for amount in amounts:
+        paise = int(round(amount * 100))
+        words = memo.get(paise)
+        if words is None:
+            words = memo[paise] = _paise_words(paise, table)
+        out.append(words)
+    return out
+
+
+# -----------------------------------
+# CLI: python -m rentbill words
+# -----------------------------------
+def verify(upto: int = CRORE, samples: int = 200000, seed: int = 0) -> list[int]:
+    """
+    Compare number_to_words_indian with reference_words for every integer
+    below `upto`, then for `samples` random values up to 10**15 and the
+    values either side of each lakh/crore power. Returns the mismatches.
+    """
+    rng = random.Random(seed)
+    extra = {p + d for p in (10 ** k for k in range(5, 16)) for d in (-1, 0, 1)}
+    extra.update(rng.randrange(10 ** 15) for _ in range(samples))
+    bad = [n for n in range(upto) if number_to_words_indian(n) != reference_words(n)]
+    bad += [n for n in sorted(extra) if number_to_words_indian(n) != reference_words(n)]
+    return bad
+
+
+def add_arguments(parser):
+    parser.add_argument("amounts", nargs="*", type=float, help="Amounts in rupees to spell (paise allowed)")
+    parser.add_argument("--verify", action="store_true",
+                        help="Check the table-driven speller against the reference for every integer below --upto")
+    parser.add_argument("--upto", type=int, default=CRORE, help="--verify: exhaustive range (default: one crore)")
+    parser.add_argument("--samples", type=int, default=200000, help="--verify: random values up to 10**15 on top")
+
+
+def run(args) -> int:
+    for words in amounts_to_words(args.amounts):
+        print(words)
+    if not args.verify:
+        return 0
+    bad = verify(args.upto, args.samples)
+    for n in bad[:20]:
+        print(f"{n}: {number_to_words_indian(n)!r} != {reference_words(n)!r}")
+    print(f"{'FAILED' if bad else 'OK'}: 0..{args.upto - 1} + {args.samples} samples, {len(bad)} mismatch(es)")
+    return 1 if bad else 0